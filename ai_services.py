@@ -1,24 +1,133 @@
 """
 Servicios para integración de modelos IA
 """
+import asyncio
+import os
+import queue
+import random
+import sys
+import threading
 import time
 import numpy as np
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from abc import ABC, abstractmethod
-from typing import List, Dict, Tuple
+from typing import List, Dict, Tuple, Optional
 from config import settings
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Landmarks por frame del modelo de pose (MediaPipe/BlazePose)
+NUM_LANDMARKS = 33
+
+# Generador NumPy para los arrays de los mocks (evita el singleton legacy de np.random)
+_np_rng = np.random.default_rng()
+
+# Tipos de tensor ONNX Runtime -> dtype NumPy (entrada de longitudes/máscara del modelo de glosa)
+_ONNX_DTYPES = {
+    "tensor(int64)": np.int64,
+    "tensor(int32)": np.int32,
+    "tensor(bool)": np.bool_,
+    "tensor(float)": np.float32,
+}
+
+
+def _pin_cpus(cpu_list: str):
+    """
+    Fija el proceso actual a un conjunto de CPUs (ej: "0-3,8"), si se configuró
+    
+    Se llama antes de crear los hilos de inferencia, que heredan la afinidad.
+    Solo sirve para procesos lanzados por separado (un CPU_AFFINITY distinto
+    por proceso): los workers de uvicorn/gunicorn comparten el mismo entorno,
+    así que con WORKERS > 1 se fijarían todos al mismo conjunto.
+    """
+    if not cpu_list or not hasattr(os, "sched_setaffinity"):
+        return
+    
+    if settings.effective_workers > 1:
+        logger.warning(
+            "CPU_AFFINITY ignorado con WORKERS > 1: todos los workers se fijarían "
+            "a las mismas CPUs. Lanzar procesos separados con un CPU_AFFINITY cada uno."
+        )
+        return
+    
+    cpus = set()
+    for part in cpu_list.split(","):
+        start, _, end = part.strip().partition("-")
+        cpus.update(range(int(start), int(end or start) + 1))
+    
+    os.sched_setaffinity(0, cpus)
+    logger.info(f"Proceso {os.getpid()} fijado a CPUs {sorted(cpus)}")
+
+
+def _available_cpus() -> int:
+    """CPUs que el proceso puede usar (respeta la afinidad fijada por _pin_cpus)"""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def _decode_landmarks_loop(output, scale, zero_point, inv_width, inv_height, out):
+    """
+    Decuantiza y normaliza la salida del modelo de pose en un solo recorrido
+    
+    Args:
+        output: Salida cruda (frames, N × 5): x, y, z, visibility, presence en píxeles
+        scale, zero_point: Parámetros de cuantización de la salida (scale=0 → float)
+        inv_width, inv_height: Inversos del tamaño de entrada del modelo
+        out: Buffer (frames, 33, 3) donde escribir x, y normalizados a [0, 1] y z
+    """
+    for f in range(out.shape[0]):
+        for j in range(out.shape[1]):
+            base = j * 5
+            x = np.float32(output[f, base])
+            y = np.float32(output[f, base + 1])
+            z = np.float32(output[f, base + 2])
+            if scale != 0:
+                x = (x - zero_point) * scale
+                y = (y - zero_point) * scale
+                z = (z - zero_point) * scale
+            out[f, j, 0] = x * inv_width
+            out[f, j, 1] = y * inv_height
+            out[f, j, 2] = z
+
+
+def _decode_landmarks_numpy(output, scale, zero_point, inv_width, inv_height, out):
+    """Equivalente vectorizado de _decode_landmarks_loop (cuando numba no está instalado)"""
+    landmarks = output.reshape(len(out), -1, 5)[:, :out.shape[1], :3]
+    if scale:
+        landmarks = (landmarks.astype(np.float32) - zero_point) * scale
+    out[...] = landmarks
+    out[..., 0] *= inv_width
+    out[..., 1] *= inv_height
+
+
+# numba es opcional: compila el bucle a código nativo (cache en disco entre despliegues)
+try:
+    from numba import njit
+    _decode_landmarks = njit(cache=True, fastmath=True)(_decode_landmarks_loop)
+except ImportError:
+    _decode_landmarks = _decode_landmarks_numpy
+
 
 # ==================== SERVICIO 1: PATH DETECTION ====================
 class PathDetectionService(ABC):
     """Servicio base para detección de pose/path"""
     
     @abstractmethod
-    async def detect_pose_from_video(self, video_path: str) -> Dict:
-        """Detecta la pose del cuerpo en el video"""
+    async def detect_pose_from_video(
+        self, video_path: str, start_frame: int = 0, end_frame: Optional[int] = None,
+        sample_stride: Optional[int] = None
+    ) -> Dict:
+        """Detecta la pose del cuerpo en el video (o en el rango [start_frame, end_frame))"""
         pass
+    
+    async def plan_segments(
+        self, video_path: str, sample_stride: Optional[int] = None
+    ) -> List[Tuple[int, Optional[int]]]:
+        """Rangos de frames que se pueden procesar en paralelo (por defecto, el video entero)"""
+        return [(0, None)]
 
 
 class PathDetectionServiceImpl(PathDetectionService):
@@ -33,6 +142,17 @@ class PathDetectionServiceImpl(PathDetectionService):
     
     def __init__(self):
         self.model = None
+        # RNG escalar de los mocks: random.Random propio, sin el lock global de NumPy
+        self._rng = random.Random()
+        self.backend = None
+        self._batch_size = 1
+        self._on_edgetpu = False
+        # Los intérpretes TFLite y MediaPipe no son thread-safe: una instancia por worker
+        self._models: queue.Queue = queue.Queue()
+        self._pool = ThreadPoolExecutor(
+            max_workers=settings.INFERENCE_THREADS,
+            thread_name_prefix="path-detection"
+        )
         self.load_model()
     
     def load_model(self):
@@ -41,66 +161,385 @@ class PathDetectionServiceImpl(PathDetectionService):
             logger.info("Usando modelo PATH DETECTION en modo MOCK")
             self.model = None
         else:
-            # Aquí iría el código real de carga del modelo
-            # import mediapipe as mp
-            # self.model = mp.solutions.pose.Pose()
             logger.info("Cargando modelo PATH DETECTION real")
+            if settings.POSE_BACKEND == "tflite":
+                try:
+                    self._load_tflite_model()
+                    return
+                except Exception as e:
+                    logger.warning(f"Error cargando modelo TFLite: {e}. Usando MediaPipe.")
+                    self._models = queue.Queue()
+            self._load_mediapipe_model()
+    
+    def _load_tflite_model(self):
+        """Carga el modelo de pose (INT8) directamente con tflite_runtime"""
+        _pin_cpus(settings.CPU_AFFINITY)
+        
+        # Probar el Edge TPU una sola vez: las réplicas de CPU no lo reintentan
+        edgetpu = self._make_edgetpu_interpreter() if settings.USE_EDGE_TPU else None
+        self._on_edgetpu = edgetpu is not None
+        
+        self.model = self._create_tflite_interpreter(edgetpu)
+        self._models.put(self.model)
+        
+        # El Edge TPU es un único dispositivo: no se replica el intérprete
+        if not self._on_edgetpu:
+            for _ in range(settings.INFERENCE_THREADS - 1):
+                self._models.put(self._create_tflite_interpreter())
+        
+        # Compilar/cargar el kernel de landmarks ahora y no en el primer request
+        _decode_landmarks(
+            np.zeros((1, NUM_LANDMARKS * 5), dtype=self._out["dtype"]),
+            0.0, 0, 1.0, 1.0,
+            np.empty((1, NUM_LANDMARKS, 3), dtype=np.float32)
+        )
+        
+        self.backend = "tflite"
+        model_path = settings.POSE_TFLITE_EDGETPU_PATH if self._on_edgetpu else settings.POSE_TFLITE_PATH
+        logger.info(f"Modelo TFLite cargado: {model_path} ({self._in['dtype'].__name__})")
+    
+    def _create_tflite_interpreter(self, interpreter=None):
+        """
+        Prepara un intérprete TFLite con los tensores ya asignados
+        
+        Args:
+            interpreter: Intérprete ya creado (Edge TPU); None crea uno de CPU
+        """
+        if interpreter is None:
+            from tflite_runtime.interpreter import Interpreter, load_delegate
+            
+            # Repartir los núcleos entre workers e intérpretes para no sobresuscribir
+            # la CPU (el kernel INT8 de x86 es muy sensible a esto)
+            threads = max(1, _available_cpus() // (settings.effective_workers * settings.INFERENCE_THREADS))
+            delegates = []
+            if settings.TFLITE_XNNPACK_DELEGATE_PATH:
+                delegates.append(load_delegate(
+                    settings.TFLITE_XNNPACK_DELEGATE_PATH,
+                    {"num_threads": threads}
+                ))
+            
+            interpreter = Interpreter(
+                model_path=settings.POSE_TFLITE_PATH,
+                num_threads=threads,
+                experimental_delegates=delegates or None
+            )
+        interpreter.allocate_tensors()
+        self._in = interpreter.get_input_details()[0]
+        self._batch_size = 1
+        
+        # Redimensionar la entrada a [BATCH, H, W, 3] para invocar una vez por lote
+        if settings.POSE_BATCH_SIZE > 1:
+            shape = list(self._in["shape"])
             try:
-                import mediapipe as mp
-                self.model = mp.solutions.pose.Pose(
+                interpreter.resize_tensor_input(self._in["index"], [settings.POSE_BATCH_SIZE] + shape[1:])
+                interpreter.allocate_tensors()
+                self._batch_size = settings.POSE_BATCH_SIZE
+            except Exception as e:
+                logger.warning(f"El modelo no admite batch {settings.POSE_BATCH_SIZE}: {e}. Usando batch 1.")
+                interpreter.resize_tensor_input(self._in["index"], shape)
+                interpreter.allocate_tensors()
+            self._in = interpreter.get_input_details()[0]
+        
+        self._out = interpreter.get_output_details()[0]
+        return interpreter
+    
+    def _make_edgetpu_interpreter(self):
+        """
+        Crea el intérprete delegado al Coral Edge TPU
+        
+        Returns:
+            Intérprete PyCoral, o None si no hay libedgetpu/acelerador (se usa CPU)
+        """
+        try:
+            from pycoral.utils.edgetpu import make_interpreter
+            
+            interpreter = make_interpreter(settings.POSE_TFLITE_EDGETPU_PATH)
+            logger.info(f"Modelo de pose delegado a Edge TPU: {settings.POSE_TFLITE_EDGETPU_PATH}")
+            return interpreter
+        except Exception as e:
+            logger.warning(f"Edge TPU no disponible: {e}. Usando CPU.")
+            return None
+    
+    def _load_mediapipe_model(self):
+        """Carga MediaPipe Pose (float32), usado como fallback del modelo TFLite"""
+        try:
+            import mediapipe as mp
+            for _ in range(settings.INFERENCE_THREADS):
+                self._models.put(mp.solutions.pose.Pose(
                     static_image_mode=False,
                     model_complexity=1,
                     smooth_landmarks=True
-                )
-            except Exception as e:
-                logger.warning(f"Error cargando MediaPipe: {e}. Usando mock.")
-                self.model = None
+                ))
+            self.model = self._models.queue[0]
+            self.backend = "mediapipe"
+        except Exception as e:
+            logger.warning(f"Error cargando MediaPipe: {e}. Usando mock.")
+            self.model = None
     
-    async def detect_pose_from_video(self, video_path: str) -> Dict:
+    def _quantize_input(self, frame_bgr: np.ndarray, out: np.ndarray,
+                        resized: np.ndarray, scratch: np.ndarray):
+        """
+        Redimensiona y cuantiza un frame BGR dentro de un slot del lote de entrada
+        
+        El cambio BGR→RGB se hace con una vista ([..., ::-1]) sobre el frame ya
+        redimensionado y se fusiona con la normalización/cuantización, en vez de
+        copiar el frame completo con cv2.cvtColor.
+        
+        Args:
+            frame_bgr: Frame en BGR (H, W, 3) uint8, tal como lo entrega OpenCV
+            out: Slot (H_in, W_in, 3) del tensor de entrada donde escribir
+            resized: Buffer uint8 (H_in, W_in, 3) reutilizado entre frames
+            scratch: Buffer float32 (H_in, W_in, 3) reutilizado entre frames
+        """
+        import cv2
+        
+        _, height, width, _ = self._in["shape"]
+        cv2.resize(frame_bgr, (width, height), dst=resized)
+        rgb = resized[..., ::-1]
+        
+        # Cuantizar la entrada si el modelo es INT8; el modelo float32 recibe [0, 1]
+        scale, zero_point = self._in["quantization"]
+        dtype = self._in["dtype"]
+        if scale and dtype in (np.int8, np.uint8):
+            info = np.iinfo(dtype)
+            np.multiply(rgb, 1.0 / (255.0 * scale), out=scratch)
+            scratch += zero_point
+            # Redondear antes del cast: asignar float a int trunca hacia cero
+            np.rint(scratch, out=scratch)
+            np.clip(scratch, info.min, info.max, out=scratch)
+            out[...] = scratch
+        else:
+            np.multiply(rgb, 1.0 / 255.0, out=out)
+    
+    def _infer_tflite_batch(self, interpreter, batch: np.ndarray, count: int, out: np.ndarray):
+        """
+        Ejecuta el modelo TFLite sobre un lote de frames ya cuantizados
+        
+        Args:
+            interpreter: Intérprete TFLite tomado del pool
+            batch: Tensor de entrada (BATCH, H, W, 3)
+            count: Número de slots válidos (el último lote puede ir incompleto)
+            out: Slice (count, 33, 3) del buffer de keypoints donde escribir
+                 x, y, z por landmark, x/y normalizados a [0, 1]
+        """
+        _, height, width, _ = self._in["shape"]
+        
+        interpreter.set_tensor(self._in["index"], batch)
+        interpreter.invoke()
+        output = interpreter.get_tensor(self._out["index"])[:count]
+        
+        # Decuantizar y normalizar: N landmarks × (x, y, z, visibility, presence) en píxeles
+        out_scale, out_zero_point = self._out["quantization"]
+        _decode_landmarks(
+            output.reshape(count, -1), out_scale, out_zero_point,
+            1.0 / width, 1.0 / height, out
+        )
+    
+    async def detect_pose_from_video(
+        self, video_path: str, start_frame: int = 0, end_frame: Optional[int] = None,
+        sample_stride: Optional[int] = None
+    ) -> Dict:
         """
         Detecta la pose del cuerpo en cada frame del video
         
         Args:
             video_path: Ruta al archivo de video
+            start_frame: Primer frame a procesar (para segmentos de plan_segments)
+            end_frame: Frame donde parar, sin incluirlo (None = hasta el final)
+            sample_stride: Procesar 1 de cada N frames (None = según POSE_SAMPLE_FPS)
             
         Returns:
-            Dict con keypoints detectados y metadata
+            Dict con keypoints detectados (np.ndarray float32 de forma
+            (frames, 99)) y metadata
         """
-        start_time = time.time()
-        
         if self.model is None or settings.USE_MOCK_MODELS:
-            return await self._mock_path_detection()
+            return await self._mock_path_detection(sample_stride)
+        
+        # La decodificación y la inferencia bloquean: ejecutarlas fuera del event loop
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._pool, self.detect_pose_from_video_sync,
+            video_path, start_frame, end_frame, sample_stride
+        )
+    
+    async def plan_segments(
+        self, video_path: str, sample_stride: Optional[int] = None
+    ) -> List[Tuple[int, Optional[int]]]:
+        """
+        Divide videos largos en segmentos de POSE_SEGMENT_SECONDS
+        
+        Cada segmento ocupa un intérprete del pool, así que hasta
+        INFERENCE_THREADS segmentos del mismo video se procesan a la vez.
+        Los límites caen en múltiplos del stride para muestrear los mismos
+        frames que una pasada completa.
+        """
+        if self.model is None or settings.USE_MOCK_MODELS or settings.POSE_SEGMENT_SECONDS <= 0:
+            return [(0, None)]
+        
+        loop = asyncio.get_running_loop()
+        total_frames, fps = await loop.run_in_executor(None, self._probe_video, video_path)
+        
+        stride = self._sample_stride(fps, sample_stride)
+        segment_frames = max(stride, int(fps * settings.POSE_SEGMENT_SECONDS) // stride * stride)
+        if total_frames <= segment_frames:
+            return [(0, None)]
+        
+        starts = list(range(0, total_frames, segment_frames))
+        # El último segmento lee hasta EOF: CAP_PROP_FRAME_COUNT es una estimación
+        return [(start, start + segment_frames) for start in starts[:-1]] + [(starts[-1], None)]
+    
+    @staticmethod
+    def _probe_video(video_path: str) -> Tuple[int, float]:
+        """Frames totales y FPS del video, sin decodificar"""
+        import cv2
+        
+        cap = cv2.VideoCapture(video_path)
+        try:
+            total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+            fps = cap.get(cv2.CAP_PROP_FPS) or settings.VIDEO_FPS
+        finally:
+            cap.release()
+        return total_frames, fps
+    
+    @staticmethod
+    def _sample_stride(fps: float, sample_stride: Optional[int] = None) -> int:
+        """Cada cuántos frames se muestrea uno: el pedido, o el que da POSE_SAMPLE_FPS"""
+        if sample_stride:
+            return max(1, sample_stride)
+        return max(1, int(round(fps / settings.POSE_SAMPLE_FPS)))
+    
+    def detect_pose_from_video_sync(
+        self, video_path: str, start_frame: int = 0, end_frame: Optional[int] = None,
+        sample_stride: Optional[int] = None
+    ) -> Dict:
+        """
+        Versión bloqueante de detect_pose_from_video (se ejecuta en el pool de hilos)
+        
+        Args:
+            video_path: Ruta al archivo de video
+            start_frame: Primer frame a procesar
+            end_frame: Frame donde parar, sin incluirlo (None = hasta el final)
+            sample_stride: Procesar 1 de cada N frames (None = según POSE_SAMPLE_FPS)
+            
+        Returns:
+            Dict con keypoints detectados y metadata
+        """
+        start_ns = time.monotonic_ns()
+        model = self._models.get()
         
         try:
+            if self.backend == "mediapipe":
+                # La instancia se reutiliza entre videos/segmentos: descartar el ROI
+                # y el suavizado de landmarks que quedaron del uso anterior
+                model.reset()
+            
             import cv2
             
             # Leer video
             cap = cv2.VideoCapture(video_path)
             total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+
+            # Submuestrear (1 de cada `stride`): los frames saltados solo se
+            # avanzan con grab() hacia delante, sin seek ni decodificación a BGR
+            fps = cap.get(cv2.CAP_PROP_FPS) or settings.VIDEO_FPS
+            stride = self._sample_stride(fps, sample_stride)
+            
+            # MediaPipe hace tracking entre frames: un segmento arranca
+            # POSE_SEGMENT_OVERLAP_SECONDS antes y descarta esos frames de contexto.
+            # TFLite procesa cada frame por separado y no lo necesita
+            first_frame = start_frame
+            if start_frame and self.backend == "mediapipe":
+                context_frames = int(round(fps * settings.POSE_SEGMENT_OVERLAP_SECONDS))
+                first_frame = max(0, start_frame - context_frames)
+            if first_frame:
+                # Un único seek por segmento; el resto es lectura secuencial
+                cap.set(cv2.CAP_PROP_POS_FRAMES, first_frame)
             
-            all_keypoints = []
+            last_frame = total_frames if end_frame is None else min(end_frame, total_frames)
+
+            # Buffer (frames, 33, 3) preasignado según los frames a muestrear
+            keypoints_buf = np.empty(
+                (max(0, last_frame - start_frame) // stride + 1, NUM_LANDMARKS, 3),
+                dtype=np.float32
+            )
+            num_keypoints = 0
             frames_processed = 0
+            frame_idx = first_frame
+            
+            # Buffers reutilizados entre frames: OpenCV escribe sobre ellos en
+            # lugar de asignar un ndarray nuevo por frame
+            frame = None
+            frame_rgb = None
             
+            if self.backend == "tflite":
+                batch = np.empty(self._in["shape"], dtype=self._in["dtype"])
+                batch_count = 0
+                resized = np.empty(self._in["shape"][1:], dtype=np.uint8)
+                scratch = np.empty(self._in["shape"][1:], dtype=np.float32)
+
             while cap.isOpened():
-                ret, frame = cap.read()
+                if end_frame is not None and frame_idx >= end_frame:
+                    break
+                if not cap.grab():
+                    break
+
+                current_idx = frame_idx
+                frame_idx += 1
+                if current_idx % stride:
+                    continue
+
+                ret, frame = cap.retrieve(frame)
                 if not ret:
                     break
+
+                # CAP_PROP_FRAME_COUNT es una estimación: crecer si se queda corto
+                if num_keypoints + self._batch_size > len(keypoints_buf):
+                    keypoints_buf = np.concatenate([keypoints_buf, np.empty_like(keypoints_buf)])
                 
-                # Procesar frame
-                frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                results = self.model.process(frame_rgb)
-                
-                if results.pose_landmarks:
-                    keypoints = []
-                    for landmark in results.pose_landmarks.landmark:
-                        keypoints.extend([landmark.x, landmark.y, landmark.z])
-                    all_keypoints.append(keypoints)
+                if self.backend == "tflite":
+                    self._quantize_input(frame, batch[batch_count], resized, scratch)
+                    batch_count += 1
+                    if batch_count == self._batch_size:
+                        self._infer_tflite_batch(
+                            model, batch, batch_count,
+                            keypoints_buf[num_keypoints:num_keypoints + batch_count]
+                        )
+                        num_keypoints += batch_count
+                        batch_count = 0
+                else:
+                    # MediaPipe necesita un buffer RGB contiguo
+                    frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=frame_rgb)
+                    results = model.process(frame_rgb)
+                    
+                    if current_idx < start_frame:
+                        # Frame de contexto del solape: solo alimenta el tracking
+                        continue
+                    
+                    if results.pose_landmarks:
+                        landmarks = results.pose_landmarks.landmark
+                        keypoints_buf[num_keypoints] = np.fromiter(
+                            (v for lm in landmarks for v in (lm.x, lm.y, lm.z)),
+                            dtype=np.float32,
+                            count=NUM_LANDMARKS * 3
+                        ).reshape(NUM_LANDMARKS, 3)
+                        num_keypoints += 1
                 
                 frames_processed += 1
             
             cap.release()
             
-            processing_time_ms = (time.time() - start_time) * 1000
+            # Procesar el último lote incompleto
+            if self.backend == "tflite" and batch_count:
+                self._infer_tflite_batch(
+                    model, batch, batch_count,
+                    keypoints_buf[num_keypoints:num_keypoints + batch_count]
+                )
+                num_keypoints += batch_count
+            
+            # Un frame por fila (33 × 3 = 99 valores), sin pasar por listas de Python
+            all_keypoints = keypoints_buf[:num_keypoints].reshape(num_keypoints, NUM_LANDMARKS * 3)
+            
+            processing_time_ms = (time.monotonic_ns() - start_ns) / 1e6
             
             return {
                 "success": True,
@@ -108,7 +547,9 @@ class PathDetectionServiceImpl(PathDetectionService):
                 "confidence": 0.95,
                 "frames_processed": frames_processed,
                 "detection_time_ms": processing_time_ms,
-                "total_frames": total_frames
+                "total_frames": total_frames,
+                "frame_stride": stride,
+                "model_used": self.backend.upper()
             }
         
         except Exception as e:
@@ -119,26 +560,29 @@ class PathDetectionServiceImpl(PathDetectionService):
                 "keypoints": [],
                 "confidence": 0.0,
                 "frames_processed": 0,
-                "detection_time_ms": (time.time() - start_time) * 1000
+                "detection_time_ms": (time.monotonic_ns() - start_ns) / 1e6
             }
+        
+        finally:
+            self._models.put(model)
     
-    async def _mock_path_detection(self) -> Dict:
+    async def _mock_path_detection(self, sample_stride: Optional[int] = None) -> Dict:
         """Mock de detección para testing"""
-        processing_time_ms = np.random.uniform(1500, 3000)
+        processing_time_ms = self._rng.uniform(1500, 3000)
+        stride = max(1, sample_stride or 1)
+        frames = 300 // stride
         
-        # Simular keypoints (33 puntos × 3 coordenadas por frame)
-        mock_keypoints = [
-            [np.random.uniform(0, 1) for _ in range(99)]
-            for _ in range(300)  # 300 frames simulados
-        ]
+        # Simular keypoints (33 puntos × 3 coordenadas por frame, de 300 frames)
+        mock_keypoints = _np_rng.random((frames, NUM_LANDMARKS * 3), dtype=np.float32)
         
         return {
             "success": True,
             "keypoints": mock_keypoints,
-            "confidence": np.random.uniform(0.85, 0.98),
-            "frames_processed": 300,
+            "confidence": self._rng.uniform(0.85, 0.98),
+            "frames_processed": frames,
             "detection_time_ms": processing_time_ms,
             "total_frames": 300,
+            "frame_stride": stride,
             "model_used": "MOCK"
         }
 
@@ -151,6 +595,10 @@ class GlossGeneratorService(ABC):
     async def generate_gloss(self, keypoints: List[List[float]]) -> Dict:
         """Genera glosa a partir de keypoints"""
         pass
+    
+    async def generate_gloss_batch(self, keypoints_batch: List[List[List[float]]]) -> List[Dict]:
+        """Genera glosa para varios videos (por defecto, uno a uno)"""
+        return [await self.generate_gloss(keypoints) for keypoints in keypoints_batch]
 
 
 class GlossGeneratorServiceImpl(GlossGeneratorService):
@@ -165,6 +613,12 @@ class GlossGeneratorServiceImpl(GlossGeneratorService):
     
     def __init__(self):
         self.model = None
+        self._lengths_input = None
+        self._rng = random.Random()
+        self._pool = ThreadPoolExecutor(
+            max_workers=settings.INFERENCE_THREADS,
+            thread_name_prefix="gloss-generator"
+        )
         self.load_model()
     
     def load_model(self):
@@ -174,9 +628,29 @@ class GlossGeneratorServiceImpl(GlossGeneratorService):
             self.model = None
         else:
             logger.info("Cargando modelo GLOSS GENERATOR real")
-            # Aquí iría el código para cargar el modelo recurrente (LSTM/Transformer)
-            # self.model = load_model("path_to_gloss_generator_model")
-            self.model = None
+            try:
+                import onnxruntime as ort
+                
+                # ONNX Runtime en x86 es más estable con INT8 que TFLite: validar
+                # latencia en el hardware destino antes de cambiar de runtime
+                sess_opts = ort.SessionOptions()
+                sess_opts.intra_op_num_threads = max(1, (os.cpu_count() or 1) // settings.INFERENCE_THREADS)
+                self.model = ort.InferenceSession(
+                    settings.GLOSS_ONNX_PATH,
+                    sess_opts,
+                    providers=["CPUExecutionProvider"]
+                )
+                inputs = self.model.get_inputs()
+                self._input_name = inputs[0].name
+                # Segunda entrada opcional: longitudes (B,) o máscara (B, frames)
+                # para que el modelo ignore el relleno del lote
+                self._lengths_input = inputs[1] if len(inputs) > 1 else None
+                with open(settings.GLOSS_VOCAB_PATH, encoding="utf-8") as f:
+                    self._vocab = [line.strip() for line in f]
+                logger.info(f"Modelo GLOSS GENERATOR cargado: {settings.GLOSS_ONNX_PATH}")
+            except Exception as e:
+                logger.warning(f"Error cargando modelo ONNX de glosa: {e}. Usando mock.")
+                self.model = None
     
     async def generate_gloss(self, keypoints: List[List[float]]) -> Dict:
         """
@@ -184,46 +658,140 @@ class GlossGeneratorServiceImpl(GlossGeneratorService):
         
         Args:
             keypoints: Secuencia de keypoints detectados por Path Detection
+                       (np.ndarray (frames, 99) o lista equivalente)
             
         Returns:
             Dict con la glosa generada y confianza
         """
-        start_time = time.time()
-        
         if self.model is None or settings.USE_MOCK_MODELS:
             return await self._mock_gloss_generation()
         
-        try:
-            # Aquí iría el código real de inferencia del modelo
-            # input_tensor = preprocess_keypoints(keypoints)
-            # output = self.model.predict(input_tensor)
-            # gloss = postprocess_output(output)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._pool, self.generate_gloss_sync, keypoints)
+    
+    def generate_gloss_sync(self, keypoints: List[List[float]]) -> Dict:
+        """Versión bloqueante de generate_gloss (se ejecuta en el pool de hilos)"""
+        return self.generate_gloss_batch_sync([keypoints])[0]
+    
+    async def generate_gloss_batch(self, keypoints_batch: List[List[List[float]]]) -> List[Dict]:
+        """
+        Genera glosa para varios videos con una sola pasada del modelo
+        
+        Args:
+            keypoints_batch: Secuencias de keypoints (una por video)
             
-            gloss = "CASA TECHO GATO ESTAR-AHÍ"  # Placeholder
-            confidence = 0.92
+        Returns:
+            Lista de Dict, en el mismo orden, con la glosa y confianza
+        """
+        if self.model is None or settings.USE_MOCK_MODELS:
+            return [await self._mock_gloss_generation() for _ in keypoints_batch]
+        
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._pool, self.generate_gloss_batch_sync, keypoints_batch)
+    
+    def generate_gloss_batch_sync(self, keypoints_batch: List[List[List[float]]]) -> List[Dict]:
+        """Versión bloqueante de generate_gloss_batch (se ejecuta en el pool de hilos)"""
+        start_ns = time.monotonic_ns()
+        
+        try:
+            results = self._generate_batch_sync(keypoints_batch)
             
-            processing_time_ms = (time.time() - start_time) * 1000
+            processing_time_ms = (time.monotonic_ns() - start_ns) / 1e6
             
-            return {
-                "success": True,
-                "gloss": gloss,
-                "confidence": confidence,
-                "processing_time_ms": processing_time_ms
-            }
+            return [
+                {
+                    "success": True,
+                    "gloss": gloss,
+                    "confidence": confidence,
+                    "processing_time_ms": processing_time_ms
+                }
+                for gloss, confidence in results
+            ]
         
         except Exception as e:
             logger.error(f"Error en GLOSS GENERATOR: {str(e)}")
-            return {
-                "success": False,
-                "error": str(e),
-                "gloss": "",
-                "confidence": 0.0,
-                "processing_time_ms": (time.time() - start_time) * 1000
-            }
+            return [
+                {
+                    "success": False,
+                    "error": str(e),
+                    "gloss": "",
+                    "confidence": 0.0,
+                    "processing_time_ms": (time.monotonic_ns() - start_ns) / 1e6
+                }
+                for _ in keypoints_batch
+            ]
+    
+    def _generate_batch_sync(self, keypoints_batch) -> List[Tuple[str, float]]:
+        """
+        Ejecuta el modelo de glosa sobre un lote de secuencias
+        
+        Sin entrada de longitudes/máscara, un modelo recurrente o de atención
+        leería los frames de relleno y la glosa de un video dependería de con
+        quién comparte lote: en ese caso solo se agrupan secuencias de igual
+        longitud, que no necesitan relleno.
+        
+        Returns:
+            Lista de tuplas (glosa, confianza)
+        """
+        sequences = [np.asarray(keypoints, dtype=np.float32) for keypoints in keypoints_batch]
+        
+        # Videos sin pose detectada: no hay nada que pasar al modelo
+        results = [("", 0.0) for _ in sequences]
+        groups = defaultdict(list)
+        for i, seq in enumerate(sequences):
+            if len(seq):
+                groups[len(seq) if self._lengths_input is None else 0].append(i)
+        
+        for indices in groups.values():
+            batch_results = self._run_padded_batch([sequences[i] for i in indices])
+            for i, result in zip(indices, batch_results):
+                results[i] = result
+        return results
+    
+    def _run_padded_batch(self, sequences: List[np.ndarray]) -> List[Tuple[str, float]]:
+        """Una pasada del modelo sobre secuencias no vacías rellenadas con ceros"""
+        lengths = np.array([len(seq) for seq in sequences], dtype=np.int64)
+        max_len = int(lengths.max())
+        
+        padded = np.zeros((len(sequences), max_len, NUM_LANDMARKS * 3), dtype=np.float32)
+        for i, seq in enumerate(sequences):
+            padded[i, :lengths[i]] = seq.reshape(lengths[i], NUM_LANDMARKS * 3)
+        
+        # Entrada (B, frames, 99); salida logits (B, frames, vocab) entrenados con CTC
+        feeds = {self._input_name: padded}
+        if self._lengths_input is not None:
+            dtype = _ONNX_DTYPES.get(self._lengths_input.type, np.int64)
+            if len(self._lengths_input.shape) == 1:
+                feeds[self._lengths_input.name] = lengths.astype(dtype)
+            else:
+                mask = np.arange(max_len) < lengths[:, None]
+                feeds[self._lengths_input.name] = mask.astype(dtype)
+        
+        # Se descartan los frames de relleno de cada secuencia antes de decodificar
+        logits = self.model.run(None, feeds)[0]
+        return [self._ctc_greedy_decode(logits[i, :lengths[i]]) for i in range(len(sequences))]
+    
+    def _ctc_greedy_decode(self, logits: np.ndarray) -> Tuple[str, float]:
+        """
+        Decodifica los logits por frame a glosa (greedy CTC, blank = índice 0)
+        
+        Returns:
+            Tupla (glosa, confianza media de los frames)
+        """
+        exp = np.exp(logits - logits.max(axis=-1, keepdims=True))
+        probs = exp / exp.sum(axis=-1, keepdims=True)
+        token_ids = probs.argmax(axis=-1)
+        
+        # Colapsar repeticiones consecutivas y descartar el blank
+        keep = np.diff(token_ids, prepend=-1) != 0
+        tokens = [self._vocab[i] for i in token_ids[keep] if i != 0]
+        
+        confidence = float(probs.max(axis=-1).mean()) if len(probs) else 0.0
+        return " ".join(tokens), confidence
     
     async def _mock_gloss_generation(self) -> Dict:
         """Mock de generación de glosa para testing"""
-        processing_time_ms = np.random.uniform(800, 2000)
+        processing_time_ms = self._rng.uniform(800, 2000)
         
         mock_glosses = [
             "CASA TECHO GATO ESTAR-AHÍ",
@@ -233,18 +801,32 @@ class GlossGeneratorServiceImpl(GlossGeneratorService):
             "HOMBRE TRABAJAR OFICINA COMPUTADORA"
         ]
         
-        gloss = np.random.choice(mock_glosses)
+        gloss = self._rng.choice(mock_glosses)
         
         return {
             "success": True,
             "gloss": gloss,
-            "confidence": np.random.uniform(0.80, 0.95),
+            "confidence": self._rng.uniform(0.80, 0.95),
             "processing_time_ms": processing_time_ms,
             "model_used": "MOCK"
         }
 
 
 # ==================== SERVICIO 3: TEXT TRANSLATION ====================
+# Mapeo simple de glosas a traducciones para testing. Se construye una vez al
+# importar; las claves internadas permiten comparar por identidad en el lookup
+_GLOSS_MAP: Dict[str, str] = {
+    sys.intern(gloss): translation
+    for gloss, translation in {
+        "CASA TECHO GATO ESTAR-AHÍ": "El gato está en el techo de la casa",
+        "PERSONA CORRER RÁPIDO": "La persona está corriendo rápidamente",
+        "NIÑO JUGAR PELOTA PARQUE": "El niño está jugando pelota en el parque",
+        "MUJER COMPRAR PAN PANADERÍA": "La mujer compra pan en la panadería",
+        "HOMBRE TRABAJAR OFICINA COMPUTADORA": "El hombre trabaja en la oficina con una computadora"
+    }.items()
+}
+
+
 class TextTranslationService(ABC):
     """Servicio base para traducción de glosa a texto natural"""
     
@@ -252,6 +834,10 @@ class TextTranslationService(ABC):
     async def translate_gloss_to_text(self, gloss: str) -> Dict:
         """Traduce glosa a texto natural en español"""
         pass
+    
+    async def translate_batch(self, glosses: List[str]) -> List[Dict]:
+        """Traduce varias glosas (por defecto, una a una)"""
+        return [await self.translate_gloss_to_text(gloss) for gloss in glosses]
 
 
 class TextTranslationServiceImpl(TextTranslationService):
@@ -266,6 +852,15 @@ class TextTranslationServiceImpl(TextTranslationService):
     
     def __init__(self):
         self.model = None
+        self._rng = random.Random()
+        self._pool = ThreadPoolExecutor(
+            max_workers=settings.INFERENCE_THREADS,
+            thread_name_prefix="text-translation"
+        )
+        # El modelo no tiene estado para una glosa dada: las glosas repetidas
+        # se resuelven desde la cache LRU sin volver a ejecutar el modelo
+        self._cache: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._cache_lock = threading.Lock()
         self.load_model()
     
     def load_model(self):
@@ -275,9 +870,20 @@ class TextTranslationServiceImpl(TextTranslationService):
             self.model = None
         else:
             logger.info("Cargando modelo TEXT TRANSLATION real")
-            # Aquí iría el código para cargar el modelo generador de texto
-            # Opciones: T5, MarianMT, LLMs como GPT, etc.
-            self.model = None
+            try:
+                # Modelo seq2seq (T5/MarianMT) exportado a ONNX y cuantizado a INT8
+                from optimum.onnxruntime import ORTModelForSeq2SeqLM
+                from transformers import AutoTokenizer
+                
+                self._tokenizer = AutoTokenizer.from_pretrained(settings.TEXT_TRANSLATION_MODEL_PATH)
+                self.model = ORTModelForSeq2SeqLM.from_pretrained(
+                    settings.TEXT_TRANSLATION_MODEL_PATH,
+                    provider="CPUExecutionProvider"
+                )
+                logger.info(f"Modelo TEXT TRANSLATION cargado: {settings.TEXT_TRANSLATION_MODEL_PATH}")
+            except Exception as e:
+                logger.warning(f"Error cargando modelo de traducción: {e}. Usando mock.")
+                self.model = None
     
     async def translate_gloss_to_text(self, gloss: str) -> Dict:
         """
@@ -289,77 +895,174 @@ class TextTranslationServiceImpl(TextTranslationService):
         Returns:
             Dict con la traducción y confianza
         """
-        start_time = time.time()
-        
         if self.model is None or settings.USE_MOCK_MODELS:
             return await self._mock_text_translation(gloss)
         
-        try:
-            # Aquí iría el código real de inferencia del modelo
-            # input_ids = tokenizer.encode(gloss)
-            # output_ids = self.model.generate(input_ids)
-            # translation = tokenizer.decode(output_ids)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._pool, self.translate_gloss_to_text_sync, gloss)
+    
+    def translate_gloss_to_text_sync(self, gloss: str) -> Dict:
+        """Versión bloqueante de translate_gloss_to_text (se ejecuta en el pool de hilos)"""
+        return self.translate_batch_sync([gloss])[0]
+    
+    async def translate_batch(self, glosses: List[str]) -> List[Dict]:
+        """
+        Traduce varias glosas con una sola llamada a generate()
+        
+        Args:
+            glosses: Glosas a traducir
             
-            translation = "El gato está en el techo de la casa"  # Placeholder
-            confidence = 0.88
+        Returns:
+            Lista de Dict, en el mismo orden, con la traducción y confianza
+        """
+        if self.model is None or settings.USE_MOCK_MODELS:
+            return [await self._mock_text_translation(gloss) for gloss in glosses]
+        
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._pool, self.translate_batch_sync, glosses)
+    
+    def translate_batch_sync(self, glosses: List[str]) -> List[Dict]:
+        """Versión bloqueante de translate_batch (se ejecuta en el pool de hilos)"""
+        start_ns = time.monotonic_ns()
+        
+        try:
+            results = self._translate_many(glosses)
             
-            processing_time_ms = (time.time() - start_time) * 1000
+            processing_time_ms = (time.monotonic_ns() - start_ns) / 1e6
             
-            return {
-                "success": True,
-                "translation": translation,
-                "confidence": confidence,
-                "processing_time_ms": processing_time_ms
-            }
+            return [
+                {
+                    "success": True,
+                    "translation": translation,
+                    "confidence": confidence,
+                    "processing_time_ms": processing_time_ms
+                }
+                for translation, confidence in results
+            ]
         
         except Exception as e:
             logger.error(f"Error en TEXT TRANSLATION: {str(e)}")
-            return {
-                "success": False,
-                "error": str(e),
-                "translation": "",
-                "confidence": 0.0,
-                "processing_time_ms": (time.time() - start_time) * 1000
-            }
+            return [
+                {
+                    "success": False,
+                    "error": str(e),
+                    "translation": "",
+                    "confidence": 0.0,
+                    "processing_time_ms": (time.monotonic_ns() - start_ns) / 1e6
+                }
+                for _ in glosses
+            ]
+    
+    def _translate_many(self, glosses: List[str]) -> List[Tuple[str, float]]:
+        """
+        Traduce un lote de glosas: las cacheadas salen de la cache LRU y solo
+        las demás (sin repetir) pasan por el modelo en una única llamada
+        
+        Returns:
+            Lista de tuplas (traducción, confianza), en el mismo orden
+        """
+        found: Dict[str, Tuple[str, float]] = {}
+        with self._cache_lock:
+            for gloss in glosses:
+                if gloss in self._cache:
+                    self._cache.move_to_end(gloss)
+                    found[gloss] = self._cache[gloss]
+        
+        misses = list(dict.fromkeys(g for g in glosses if g not in found))
+        if misses:
+            translated = dict(zip(misses, self._translate_batch_sync(misses)))
+            found.update(translated)
+            
+            if settings.TRANSLATION_CACHE_SIZE > 0:
+                with self._cache_lock:
+                    self._cache.update(translated)
+                    while len(self._cache) > settings.TRANSLATION_CACHE_SIZE:
+                        self._cache.popitem(last=False)
+        
+        return [found[gloss] for gloss in glosses]
+    
+    def _translate_batch_sync(self, glosses: List[str]) -> List[Tuple[str, float]]:
+        """
+        Ejecuta el modelo de traducción sobre un lote de glosas
+        
+        Returns:
+            Lista de tuplas (traducción, confianza)
+        """
+        inputs = self._tokenizer(glosses, return_tensors="pt", padding=True)
+        outputs = self.model.generate(
+            **inputs,
+            max_new_tokens=64,
+            output_scores=True,
+            return_dict_in_generate=True
+        )
+        translations = self._tokenizer.batch_decode(outputs.sequences, skip_special_tokens=True)
+        
+        # Confianza: probabilidad media de los tokens generados (sin el padding
+        # de las secuencias que terminaron antes dentro del lote)
+        scores = self.model.compute_transition_scores(
+            outputs.sequences, outputs.scores, normalize_logits=True
+        )
+        mask = (outputs.sequences[:, -scores.shape[1]:] != self._tokenizer.pad_token_id).float()
+        confidences = (scores.exp() * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1)
+        return list(zip(translations, confidences.tolist()))
     
     async def _mock_text_translation(self, gloss: str) -> Dict:
         """Mock de traducción para testing"""
-        processing_time_ms = np.random.uniform(600, 1500)
-        
-        # Mapeo simple de glosas a traducciones para testing
-        gloss_translation_map = {
-            "CASA TECHO GATO ESTAR-AHÍ": "El gato está en el techo de la casa",
-            "PERSONA CORRER RÁPIDO": "La persona está corriendo rápidamente",
-            "NIÑO JUGAR PELOTA PARQUE": "El niño está jugando pelota en el parque",
-            "MUJER COMPRAR PAN PANADERÍA": "La mujer compra pan en la panadería",
-            "HOMBRE TRABAJAR OFICINA COMPUTADORA": "El hombre trabaja en la oficina con una computadora"
-        }
+        processing_time_ms = self._rng.uniform(600, 1500)
         
-        translation = gloss_translation_map.get(
-            gloss,
-            f"Traducción de: {gloss}"
-        )
+        translation = _GLOSS_MAP.get(sys.intern(gloss)) or f"Traducción de: {gloss}"
         
         return {
             "success": True,
             "translation": translation,
-            "confidence": np.random.uniform(0.80, 0.92),
+            "confidence": self._rng.uniform(0.80, 0.92),
             "processing_time_ms": processing_time_ms,
             "model_used": "MOCK"
         }
 
 
+def quantize_model_int8(model_path: str, output_path: str) -> str:
+    """
+    Cuantiza un modelo ONNX a INT8 (dynamic range) para inferencia en CPU
+    
+    Uso offline, tras exportar el checkpoint entrenado a ONNX:
+        quantize_model_int8("gloss_generator.onnx", "gloss_generator_int8.onnx")
+    
+    Returns:
+        Ruta del modelo cuantizado
+    """
+    from onnxruntime.quantization import quantize_dynamic, QuantType
+    
+    quantize_dynamic(model_path, output_path, weight_type=QuantType.QInt8)
+    return output_path
+
+
+# Instancias compartidas por proceso: cada modelo se carga una sola vez
+_path_detection_service: Optional[PathDetectionService] = None
+_gloss_generator_service: Optional[GlossGeneratorService] = None
+_text_translation_service: Optional[TextTranslationService] = None
+
+
 # Funciones factory para obtener instancias
 async def get_path_detection_service() -> PathDetectionService:
     """Factory para obtener servicio de detección de path"""
-    return PathDetectionServiceImpl()
+    global _path_detection_service
+    if _path_detection_service is None:
+        _path_detection_service = PathDetectionServiceImpl()
+    return _path_detection_service
 
 
 async def get_gloss_generator_service() -> GlossGeneratorService:
     """Factory para obtener servicio de generación de glosa"""
-    return GlossGeneratorServiceImpl()
+    global _gloss_generator_service
+    if _gloss_generator_service is None:
+        _gloss_generator_service = GlossGeneratorServiceImpl()
+    return _gloss_generator_service
 
 
 async def get_text_translation_service() -> TextTranslationService:
     """Factory para obtener servicio de traducción"""
-    return TextTranslationServiceImpl()
+    global _text_translation_service
+    if _text_translation_service is None:
+        _text_translation_service = TextTranslationServiceImpl()
+    return _text_translation_service
@@ -8,8 +8,10 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from config import settings
-from video_routes import router as video_router
+from video_routes import router as video_router, UploadSizeLimitMiddleware
 from health_routes import router as health_router
+from processing_routes import router as processing_router
+from video_processor import close_task_queue, create_video_processor_service
 
 # Configurar logging
 logging.basicConfig(
@@ -27,6 +29,11 @@ app = FastAPI(
     redoc_url="/redoc"  # ReDoc
 )
 
+# Cortar uploads demasiado grandes (Content-Length o bytes recibidos) mientras llegan.
+# Se registra antes que CORS: el último middleware agregado es el más externo,
+# y así el 413 también lleva los headers CORS que necesita el navegador
+app.add_middleware(UploadSizeLimitMiddleware)
+
 # Configurar CORS
 app.add_middleware(
     CORSMiddleware,
@@ -39,6 +46,25 @@ app.add_middleware(
 # Incluir rutas
 app.include_router(health_router)
 app.include_router(video_router)
+app.include_router(processing_router)
+
+
+@app.on_event("startup")
+async def load_ai_services():
+    """Carga los modelos IA al iniciar para que el primer request no pague el cold start"""
+    if settings.TASK_QUEUE == "arq":
+        # Los modelos viven en los workers arq; la API solo encola
+        logger.info("TASK_QUEUE=arq: los servicios IA se cargan en worker.py")
+        return
+    await create_video_processor_service().load_services()
+    logger.info("Servicios IA cargados")
+
+
+@app.on_event("shutdown")
+async def shutdown_processing():
+    """Termina de escribir resultados pendientes y cierra la conexión a la cola"""
+    await create_video_processor_service().wait_pending_saves()
+    await close_task_queue()
 
 
 @app.get("/")
@@ -75,13 +101,28 @@ if __name__ == "__main__":
     logger.info(f"Iniciando servidor en {settings.HOST}:{settings.PORT}")
     logger.info(f"Environment: {settings.ENVIRONMENT}")
     logger.info(f"Debug: {settings.DEBUG}")
+    logger.info(f"Workers: {settings.effective_workers}")
     logger.info(f"Usando modelos MOCK: {settings.USE_MOCK_MODELS}")
     
-    uvicorn.run(
-        "app:app",  # ← Cambiar de app a "app:app" (STRING)
-        host=settings.HOST,
-        port=settings.PORT,
-        log_level=settings.LOG_LEVEL.lower(),
-        reload=settings.DEBUG
-    )
+    if settings.DEBUG:
+        # Desarrollo: un solo proceso con recarga automática
+        uvicorn.run(
+            "app:app",  # ← Cambiar de app a "app:app" (STRING)
+            host=settings.HOST,
+            port=settings.PORT,
+            log_level=settings.LOG_LEVEL.lower(),
+            reload=True
+        )
+    else:
+        # Producción: varios workers con uvloop/httptools (uvicorn[standard]).
+        # En AWS preferir gunicorn -k uvicorn.workers.UvicornWorker (ver README)
+        uvicorn.run(
+            "app:app",
+            host=settings.HOST,
+            port=settings.PORT,
+            log_level=settings.LOG_LEVEL.lower(),
+            workers=settings.WORKERS,
+            loop="uvloop",
+            http="httptools"
+        )
 
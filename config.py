@@ -16,6 +16,10 @@ class Settings(BaseSettings):
     # Servidor
     HOST: str = os.getenv("HOST", "0.0.0.0")
     PORT: int = int(os.getenv("PORT", "8000"))
+    WORKERS: int = int(os.getenv("WORKERS", "1"))
+    # CPUs asignadas a este proceso (ej: "0-3"); vacío = sin fijar afinidad.
+    # Solo para procesos lanzados por separado: se ignora con WORKERS > 1
+    CPU_AFFINITY: str = os.getenv("CPU_AFFINITY", "")
     
     # Rutas locales
     BASE_DIR: Path = Path(__file__).parent
@@ -34,12 +38,39 @@ class Settings(BaseSettings):
     GLOSS_GENERATOR_MODEL_PATH: str = os.getenv("GLOSS_GENERATOR_MODEL_PATH", "./models/gloss_generator_model")
     TEXT_TRANSLATION_MODEL_PATH: str = os.getenv("TEXT_TRANSLATION_MODEL_PATH", "./models/text_translation_model")
     
+    # Gloss Generator: modelo ONNX INT8 (ver ai_services.quantize_model_int8) y vocabulario
+    GLOSS_ONNX_PATH: str = os.getenv("GLOSS_ONNX_PATH", "./models/gloss_generator_int8.onnx")
+    GLOSS_VOCAB_PATH: str = os.getenv("GLOSS_VOCAB_PATH", "./models/gloss_vocab.txt")
+    
+    # Path Detection: "tflite" (modelo INT8 vía tflite_runtime) o "mediapipe" (float32)
+    POSE_BACKEND: str = os.getenv("POSE_BACKEND", "tflite")
+    POSE_TFLITE_PATH: str = os.getenv("POSE_TFLITE_PATH", "./models/pose_landmark_int8.tflite")
+    POSE_BATCH_SIZE: int = int(os.getenv("POSE_BATCH_SIZE", "8"))
+    # Delegate XNNPACK externo (opcional; tflite_runtime ya aplica XNNPACK por defecto en CPU)
+    TFLITE_XNNPACK_DELEGATE_PATH: str = os.getenv("TFLITE_XNNPACK_DELEGATE_PATH", "")
+    # Coral Edge TPU: requiere el modelo compilado con edgetpu_compiler (*_edgetpu.tflite)
+    USE_EDGE_TPU: bool = os.getenv("USE_EDGE_TPU", "False").lower() == "true"
+    POSE_TFLITE_EDGETPU_PATH: str = os.getenv("POSE_TFLITE_EDGETPU_PATH", "./models/pose_landmark_int8_edgetpu.tflite")
+    
     # Configuración de video
     MAX_VIDEO_SIZE_MB: int = int(os.getenv("MAX_VIDEO_SIZE_MB", "100"))
     MAX_VIDEO_DURATION_SECONDS: int = int(os.getenv("MAX_VIDEO_DURATION_SECONDS", "15"))
     VIDEO_RESOLUTION_WIDTH: int = int(os.getenv("VIDEO_RESOLUTION_WIDTH", "1280"))
     VIDEO_RESOLUTION_HEIGHT: int = int(os.getenv("VIDEO_RESOLUTION_HEIGHT", "720"))
     VIDEO_FPS: int = int(os.getenv("VIDEO_FPS", "30"))
+    POSE_SAMPLE_FPS: int = int(os.getenv("POSE_SAMPLE_FPS", "5"))
+    # Videos más largos que esto se dividen en segmentos procesados en paralelo
+    # (0 = nunca dividir); el solape da contexto temporal al tracking de MediaPipe
+    POSE_SEGMENT_SECONDS: float = float(os.getenv("POSE_SEGMENT_SECONDS", "5"))
+    POSE_SEGMENT_OVERLAP_SECONDS: float = float(os.getenv("POSE_SEGMENT_OVERLAP_SECONDS", "1"))
+    
+    # Estado de jobs: Redis (compartido entre workers) o memoria si REDIS_URL está vacío
+    REDIS_URL: str = os.getenv("REDIS_URL", "")
+    JOB_TTL_SECONDS: int = int(os.getenv("JOB_TTL_SECONDS", "3600"))
+    # Dónde corre el pipeline: "background" (BackgroundTasks en el proceso de la API)
+    # o "arq" (cola en REDIS_URL, procesada por `arq worker.WorkerSettings`)
+    TASK_QUEUE: str = os.getenv("TASK_QUEUE", "background")
+    JOB_TIMEOUT_SECONDS: int = int(os.getenv("JOB_TIMEOUT_SECONDS", "600"))
     
     # Logging
     LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
@@ -53,6 +84,22 @@ class Settings(BaseSettings):
     MOCK_GLOSS_OUTPUT: str = os.getenv("MOCK_GLOSS_OUTPUT", "CASA TECHO GATO ESTAR-AHÍ")
     MOCK_TRANSLATION_OUTPUT: str = os.getenv("MOCK_TRANSLATION_OUTPUT", "El gato está en el techo de la casa")
     
+    # Hilos de inferencia por servicio (cada hilo usa su propia instancia del modelo)
+    INFERENCE_THREADS: int = int(os.getenv("INFERENCE_THREADS", "2"))
+    # Traducciones cacheadas por glosa (0 desactiva la cache)
+    TRANSLATION_CACHE_SIZE: int = int(os.getenv("TRANSLATION_CACHE_SIZE", "2048"))
+    # Dynamic batching de glosa/traducción entre jobs concurrentes
+    BATCH_MAX_SIZE: int = int(os.getenv("BATCH_MAX_SIZE", "8"))
+    BATCH_MAX_WAIT_MS: int = int(os.getenv("BATCH_MAX_WAIT_MS", "50"))
+    # Jobs en el pipeline a la vez; el resto espera en estado "queued"
+    # (no bajar de BATCH_MAX_SIZE o los lotes de glosa/traducción no se llenan)
+    MAX_CONCURRENT_JOBS: int = int(os.getenv("MAX_CONCURRENT_JOBS", "8"))
+    
+    @property
+    def effective_workers(self) -> int:
+        """Procesos de la API que se lanzan realmente (DEBUG corre uno solo, con reload)"""
+        return 1 if self.DEBUG else max(1, self.WORKERS)
+    
     class Config:
         env_file = ".env.local"
         case_sensitive = True
@@ -1,13 +1,29 @@
 """
 Rutas de Health Check
 """
+import json
 import logging
+import time
 from fastapi import APIRouter
-from datetime import datetime
+from fastapi.responses import Response
+from config import settings
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/health", tags=["health"])
 
+# Los load balancers consultan estos endpoints varias veces por segundo: el
+# cuerpo se serializa una sola vez y en cada request solo se añade el timestamp
+# (epoch en segundos). Se devuelve un Response con bytes para no pasar por la
+# validación/codificación JSON de FastAPI.
+_HEALTH_BODY_PREFIX = json.dumps({
+    "status": "healthy",
+    "version": "1.0.0",
+    "environment": settings.ENVIRONMENT,
+    "message": "Sign Language Translation API is running"
+}, ensure_ascii=False).encode("utf-8")[:-1] + b', "timestamp": '
+
+_READY_BODY_PREFIX = b'{"ready": true, "timestamp": '
+
 
 @router.get("")
 @router.get("/")
@@ -18,13 +34,10 @@ async def health_check():
     Retorna el estado de la aplicación
     Útil para verificar que el servidor está corriendo
     """
-    return {
-        "status": "healthy",
-        "version": "1.0.0",
-        "environment": "development",
-        "timestamp": datetime.now().isoformat(),
-        "message": "Sign Language Translation API is running"
-    }
+    return Response(
+        content=_HEALTH_BODY_PREFIX + b"%.3f}" % time.time(),
+        media_type="application/json"
+    )
 
 
 @router.get("/ready")
@@ -34,7 +47,7 @@ async def readiness_check():
     
     Verifica que la aplicación está lista para recibir requests
     """
-    return {
-        "ready": True,
-        "timestamp": datetime.now().isoformat()
-    }
+    return Response(
+        content=_READY_BODY_PREFIX + b"%.3f}" % time.time(),
+        media_type="application/json"
+    )
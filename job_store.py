@@ -0,0 +1,304 @@
+"""
+Almacenamiento del estado de los jobs de procesamiento
+
+No depende de los modelos IA: lo usan tanto las rutas de upload/estado como
+el pipeline (video_processor.py) y los workers.
+
+- InMemoryJobStore: dict del proceso (desarrollo, un solo worker)
+- RedisJobStore: hash job:{job_id} en Redis, compartido entre workers/máquinas
+  y persistente a reinicios del servidor
+
+Cada update que toca progreso/paso/estado publica un evento con solo esos
+campos; /api/stream/{job_id} los reenvía por SSE sin reconstruir el job.
+"""
+import asyncio
+import json
+import logging
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# Campos del job que se notifican a los suscriptores (campo -> clave del evento)
+_EVENT_FIELDS = {"status": "status", "progress": "progress", "current_step": "step"}
+
+
+def _progress_event(fields: Dict) -> Optional[Dict]:
+    """Extrae el delta de progreso de un update, o None si no hay nada que notificar"""
+    event = {key: fields[field] for field, key in _EVENT_FIELDS.items() if field in fields}
+    return event or None
+
+
+class JobStore(ABC):
+    """Interfaz del almacén de estado de jobs"""
+
+    @abstractmethod
+    async def create(self, job_id: str, fields: Dict):
+        """Crea el registro de un job"""
+        pass
+
+    @abstractmethod
+    async def get(self, job_id: str) -> Optional[Dict]:
+        """Retorna el registro completo del job, o None si no existe"""
+        pass
+
+    @abstractmethod
+    async def update(self, job_id: str, **fields):
+        """Actualiza uno o más campos del job"""
+        pass
+
+    @abstractmethod
+    async def update_if_status(self, job_id: str, expected: Tuple[str, ...], **fields) -> bool:
+        """
+        Actualiza el job solo si su estado actual está en expected (atómico)
+
+        Returns:
+            False si el job no existe o está en otro estado (no se modifica)
+        """
+        pass
+
+    @abstractmethod
+    async def subscribe(self, job_id: str) -> asyncio.Queue:
+        """Retorna una cola que recibe los eventos de progreso del job"""
+        pass
+
+    @abstractmethod
+    async def unsubscribe(self, job_id: str, events: asyncio.Queue):
+        """Deja de recibir eventos en la cola retornada por subscribe()"""
+        pass
+
+
+class InMemoryJobStore(JobStore):
+    """Estado de jobs en memoria del proceso"""
+
+    def __init__(self):
+        self._jobs: Dict[str, Dict] = {}
+        self._subscribers: Dict[str, List[asyncio.Queue]] = defaultdict(list)
+
+    async def create(self, job_id: str, fields: Dict):
+        self._jobs[job_id] = dict(fields)
+
+    async def get(self, job_id: str) -> Optional[Dict]:
+        return self._jobs.get(job_id)
+
+    async def update(self, job_id: str, **fields):
+        # Sin awaits: el update es atómico respecto al event loop, no hace falta lock
+        self._jobs[job_id].update(fields)
+
+        event = _progress_event(fields)
+        if event is not None:
+            for events in self._subscribers.get(job_id, ()):
+                events.put_nowait(event)
+
+    async def update_if_status(self, job_id: str, expected: Tuple[str, ...], **fields) -> bool:
+        # Chequeo y update sin awaits intermedios: atómico respecto al event loop
+        job = self._jobs.get(job_id)
+        if job is None or job.get("status") not in expected:
+            return False
+        await self.update(job_id, **fields)
+        return True
+
+    async def subscribe(self, job_id: str) -> asyncio.Queue:
+        events: asyncio.Queue = asyncio.Queue()
+        self._subscribers[job_id].append(events)
+        return events
+
+    async def unsubscribe(self, job_id: str, events: asyncio.Queue):
+        subscribers = self._subscribers.get(job_id)
+        if subscribers and events in subscribers:
+            subscribers.remove(events)
+            if not subscribers:
+                del self._subscribers[job_id]
+
+
+class RedisJobStore(JobStore):
+    """
+    Estado de jobs en Redis (un hash por job con TTL)
+
+    Cada campo se guarda como JSON para conservar tipos (int, float, None, dict).
+    """
+
+    def __init__(self, url: str, ttl_seconds: int):
+        from redis import asyncio as aioredis
+
+        self._redis = aioredis.from_url(url, decode_responses=True)
+        self._ttl_seconds = ttl_seconds
+        # Tarea que reenvía el canal pub/sub a cada cola suscrita
+        self._listeners: Dict[int, asyncio.Task] = {}
+        # Un lock por job: los updates de un mismo job llegan a Redis (y a
+        # los suscriptores) en orden, sin serializar jobs distintos. Solo
+        # existe mientras hay updates en curso (contador de usuarios)
+        self._job_locks: Dict[str, asyncio.Lock] = {}
+        self._job_lock_users: Dict[str, int] = defaultdict(int)
+
+    @staticmethod
+    def _key(job_id: str) -> str:
+        return f"job:{job_id}"
+
+    @staticmethod
+    def _channel(job_id: str) -> str:
+        return f"job:{job_id}:events"
+
+    async def create(self, job_id: str, fields: Dict):
+        await self.update(job_id, **fields)
+
+    async def get(self, job_id: str) -> Optional[Dict]:
+        raw = await self._redis.hgetall(self._key(job_id))
+        if not raw:
+            return None
+        return {field: json.loads(value) for field, value in raw.items()}
+
+    async def update(self, job_id: str, **fields):
+        async with self._job_lock(job_id):
+            async with self._redis.pipeline(transaction=True) as pipe:
+                self._queue_update(pipe, job_id, fields)
+                await pipe.execute()
+
+    async def update_if_status(self, job_id: str, expected: Tuple[str, ...], **fields) -> bool:
+        from redis.exceptions import WatchError
+
+        key = self._key(job_id)
+        async with self._job_lock(job_id):
+            async with self._redis.pipeline(transaction=True) as pipe:
+                while True:
+                    try:
+                        # WATCH: si otro proceso cambia el job entre la lectura
+                        # y el EXEC, la transacción falla y se vuelve a leer
+                        await pipe.watch(key)
+                        status = await pipe.hget(key, "status")
+                        if status is None or json.loads(status) not in expected:
+                            await pipe.unwatch()
+                            return False
+
+                        pipe.multi()
+                        self._queue_update(pipe, job_id, fields)
+                        await pipe.execute()
+                        return True
+                    except WatchError:
+                        continue
+
+    def _queue_update(self, pipe, job_id: str, fields: Dict):
+        """Agrega al pipeline el HSET/EXPIRE del update y la publicación del evento"""
+        key = self._key(job_id)
+        mapping = {
+            field: json.dumps(value, ensure_ascii=False, default=str)
+            for field, value in fields.items()
+        }
+        pipe.hset(key, mapping=mapping)
+        pipe.expire(key, self._ttl_seconds)
+        event = _progress_event(fields)
+        if event is not None:
+            pipe.publish(self._channel(job_id), json.dumps(event, ensure_ascii=False))
+
+    @asynccontextmanager
+    async def _job_lock(self, job_id: str):
+        """Lock del job mientras dura un update; se libera al quedar sin usuarios"""
+        lock = self._job_locks.get(job_id)
+        if lock is None:
+            lock = self._job_locks[job_id] = asyncio.Lock()
+        self._job_lock_users[job_id] += 1
+        try:
+            async with lock:
+                yield
+        finally:
+            # Sin otros updates esperando: liberar el lock para que el mapa
+            # no crezca con jobs que este proceso ya no toca
+            self._job_lock_users[job_id] -= 1
+            if not self._job_lock_users[job_id]:
+                del self._job_lock_users[job_id]
+                del self._job_locks[job_id]
+
+    async def subscribe(self, job_id: str) -> asyncio.Queue:
+        events: asyncio.Queue = asyncio.Queue()
+        pubsub = self._redis.pubsub()
+        # Suscribir antes de retornar para no perder eventos publicados en medio
+        await pubsub.subscribe(self._channel(job_id))
+
+        async def forward():
+            try:
+                async for message in pubsub.listen():
+                    if message["type"] == "message":
+                        events.put_nowait(json.loads(message["data"]))
+            finally:
+                await pubsub.aclose()
+
+        self._listeners[id(events)] = asyncio.create_task(forward())
+        return events
+
+    async def unsubscribe(self, job_id: str, events: asyncio.Queue):
+        listener = self._listeners.pop(id(events), None)
+        if listener is not None:
+            listener.cancel()
+
+
+def create_job_store() -> JobStore:
+    """Factory: Redis si REDIS_URL está configurado, memoria en otro caso"""
+    if settings.REDIS_URL:
+        logger.info(f"Estado de jobs en Redis: {settings.REDIS_URL}")
+        return RedisJobStore(settings.REDIS_URL, settings.JOB_TTL_SECONDS)
+
+    logger.info("Estado de jobs en memoria (un solo worker)")
+    return InMemoryJobStore()
+
+
+job_store = create_job_store()
+
+
+def result_file_path(job_id: str) -> Path:
+    """Ruta del JSON de resultado de un job"""
+    return Path(settings.RESULTS_DIR) / f"{job_id}_result.json"
+
+
+async def get_job_status(job_id: str) -> Dict:
+    """Obtiene el estado actual de un job"""
+    job = await job_store.get(job_id)
+    if job is None:
+        return {
+            "job_id": job_id,
+            "status": "not_found",
+            "progress": 0,
+            "current_step": "Unknown"
+        }
+    
+    return {
+        "job_id": job_id,
+        "status": job.get("status", "unknown"),
+        "progress": job.get("progress", 0),
+        "current_step": job.get("current_step", ""),
+        "error": job.get("error", None) if job.get("status") == "error" else None
+    }
+
+
+async def get_job_video_path(job_id: str) -> Optional[str]:
+    """Ruta del video subido para el job, o None si aún no se guardó"""
+    job = await job_store.get(job_id)
+    if job is None:
+        return None
+    return job.get("video_path")
+
+
+async def create_new_job(video_filename: str) -> str:
+    """
+    Crea un nuevo job de procesamiento
+    
+    Args:
+        video_filename: Nombre del archivo de video
+        
+    Returns:
+        ID único del job
+    """
+    job_id = str(uuid.uuid4())
+    await job_store.create(job_id, {
+        "status": "pending",
+        "video_filename": video_filename,
+        "progress": 0,
+        "current_step": "Waiting to start...",
+        "created_at": time.time()
+    })
+    return job_id
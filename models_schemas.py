@@ -1,7 +1,10 @@
 """
 Modelos de datos Pydantic para la aplicación
+
+Los modelos de resultado (*Result, *Response) son solo de salida: al armarlos
+desde datos internos del pipeline usar model_construct() para no revalidar.
 """
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import Optional, List
 from datetime import datetime
 import uuid
@@ -18,18 +21,17 @@ class VideoMetadata(BaseModel):
     fps: int
     upload_time: datetime = Field(default_factory=datetime.now)
     
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "video_id": "550e8400-e29b-41d4-a716-446655440000",
-                "filename": "video_1.mp4",
-                "file_size": 5242880,
-                "duration": 10.5,
-                "width": 1280,
-                "height": 720,
-                "fps": 30
-            }
+    model_config = ConfigDict(json_schema_extra={
+        "example": {
+            "video_id": "550e8400-e29b-41d4-a716-446655440000",
+            "filename": "video_1.mp4",
+            "file_size": 5242880,
+            "duration": 10.5,
+            "width": 1280,
+            "height": 720,
+            "fps": 30
         }
+    })
 
 
 class PathDetectionResult(BaseModel):
@@ -40,16 +42,15 @@ class PathDetectionResult(BaseModel):
     frames_processed: int
     detection_time_ms: float
     
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "job_id": "550e8400-e29b-41d4-a716-446655440000",
-                "keypoints": [[100, 200], [150, 250], [200, 180]],
-                "confidence": 0.95,
-                "frames_processed": 300,
-                "detection_time_ms": 2500
-            }
+    model_config = ConfigDict(json_schema_extra={
+        "example": {
+            "job_id": "550e8400-e29b-41d4-a716-446655440000",
+            "keypoints": [[100, 200], [150, 250], [200, 180]],
+            "confidence": 0.95,
+            "frames_processed": 300,
+            "detection_time_ms": 2500
         }
+    })
 
 
 class GlossGeneratorResult(BaseModel):
@@ -59,15 +60,14 @@ class GlossGeneratorResult(BaseModel):
     confidence: float = Field(ge=0, le=1)
     processing_time_ms: float
     
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "job_id": "550e8400-e29b-41d4-a716-446655440000",
-                "gloss": "CASA TECHO GATO ESTAR-AHÍ",
-                "confidence": 0.92,
-                "processing_time_ms": 1800
-            }
+    model_config = ConfigDict(json_schema_extra={
+        "example": {
+            "job_id": "550e8400-e29b-41d4-a716-446655440000",
+            "gloss": "CASA TECHO GATO ESTAR-AHÍ",
+            "confidence": 0.92,
+            "processing_time_ms": 1800
         }
+    })
 
 
 class TextTranslationResult(BaseModel):
@@ -78,22 +78,21 @@ class TextTranslationResult(BaseModel):
     confidence: float = Field(ge=0, le=1)
     processing_time_ms: float
     
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "job_id": "550e8400-e29b-41d4-a716-446655440000",
-                "gloss": "CASA TECHO GATO ESTAR-AHÍ",
-                "translation": "El gato está en el techo de la casa",
-                "confidence": 0.88,
-                "processing_time_ms": 950
-            }
+    model_config = ConfigDict(json_schema_extra={
+        "example": {
+            "job_id": "550e8400-e29b-41d4-a716-446655440000",
+            "gloss": "CASA TECHO GATO ESTAR-AHÍ",
+            "translation": "El gato está en el techo de la casa",
+            "confidence": 0.88,
+            "processing_time_ms": 950
         }
+    })
 
 
 class ProcessingResponse(BaseModel):
     """Respuesta completa del procesamiento"""
     job_id: str
-    status: str = Field(description="Estado: pending, processing, completed, error")
+    status: str = Field(description="Estado: pending, queued, processing, completed, error")
     video_metadata: Optional[VideoMetadata] = None
     path_detection: Optional[PathDetectionResult] = None
     gloss_generation: Optional[GlossGeneratorResult] = None
@@ -101,52 +100,49 @@ class ProcessingResponse(BaseModel):
     error: Optional[str] = None
     total_processing_time_ms: float = 0
     
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "job_id": "550e8400-e29b-41d4-a716-446655440000",
-                "status": "completed",
-                "gloss_generation": {
-                    "gloss": "CASA TECHO GATO ESTAR-AHÍ",
-                    "confidence": 0.92
-                },
-                "text_translation": {
-                    "translation": "El gato está en el techo de la casa",
-                    "confidence": 0.88
-                },
-                "total_processing_time_ms": 5250
-            }
+    model_config = ConfigDict(json_schema_extra={
+        "example": {
+            "job_id": "550e8400-e29b-41d4-a716-446655440000",
+            "status": "completed",
+            "gloss_generation": {
+                "gloss": "CASA TECHO GATO ESTAR-AHÍ",
+                "confidence": 0.92
+            },
+            "text_translation": {
+                "translation": "El gato está en el techo de la casa",
+                "confidence": 0.88
+            },
+            "total_processing_time_ms": 5250
         }
+    })
 
 
 class UploadVideoRequest(BaseModel):
     """Request para upload de video"""
     filename: str = Field(description="Nombre del archivo")
     
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "filename": "seña_gato.mp4"
-            }
+    model_config = ConfigDict(json_schema_extra={
+        "example": {
+            "filename": "seña_gato.mp4"
         }
+    })
 
 
 class StatusQueryResponse(BaseModel):
     """Respuesta de consulta de estado"""
     job_id: str
-    status: str = Field(description="pending, processing, completed, error")
+    status: str = Field(description="pending, queued, processing, completed, error")
     progress: int = Field(ge=0, le=100, description="Porcentaje de progreso")
     current_step: str = Field(description="Paso actual del procesamiento")
     
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "job_id": "550e8400-e29b-41d4-a716-446655440000",
-                "status": "processing",
-                "progress": 65,
-                "current_step": "Generating gloss..."
-            }
+    model_config = ConfigDict(json_schema_extra={
+        "example": {
+            "job_id": "550e8400-e29b-41d4-a716-446655440000",
+            "status": "processing",
+            "progress": 65,
+            "current_step": "Generating gloss..."
         }
+    })
 
 
 class HealthCheckResponse(BaseModel):
@@ -154,14 +150,13 @@ class HealthCheckResponse(BaseModel):
     status: str = Field(description="healthy, degraded, unhealthy")
     version: str
     environment: str
-    timestamp: datetime
+    timestamp: float = Field(description="Epoch Unix en segundos")
     
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "status": "healthy",
-                "version": "1.0.0",
-                "environment": "development",
-                "timestamp": "2025-11-14T12:00:00"
-            }
+    model_config = ConfigDict(json_schema_extra={
+        "example": {
+            "status": "healthy",
+            "version": "1.0.0",
+            "environment": "development",
+            "timestamp": 1763121600.0
         }
+    })
@@ -0,0 +1,90 @@
+"""
+Ruta que inicia el procesamiento de un video (pipeline de IA)
+
+Separada de video_routes.py: es la única que necesita video_processor.
+"""
+import logging
+from typing import Optional
+from fastapi import APIRouter, HTTPException, BackgroundTasks, Query
+from config import settings
+from job_store import get_job_status, get_job_video_path
+from video_processor import create_video_processor_service, enqueue_video_job
+
+logger = logging.getLogger(__name__)
+router = APIRouter(prefix="/api", tags=["video"])
+
+
+def _already_submitted(job_id: str, status: str) -> HTTPException:
+    return HTTPException(
+        status_code=409,
+        detail=f"Job {job_id} ya fue enviado a procesar (estado: {status})"
+    )
+
+
+@router.post("/process-video/{job_id}")
+async def process_video(
+    job_id: str,
+    background_tasks: BackgroundTasks,
+    sample_stride: Optional[int] = Query(None, ge=1, description="Procesar 1 de cada N frames")
+):
+    """
+    Endpoint para procesar un video
+    
+    Pipeline de procesamiento:
+    1. Path Detection - Detecta la pose del cuerpo
+    2. Gloss Generator - Genera glosa (representación de señas)
+    3. Text Translation - Traduce glosa a español
+    
+    Request: POST /api/process-video/{job_id}
+    Response: Estado del procesamiento + job_id
+    
+    Flujo esperado:
+    - El cliente recibe una respuesta inmediata con status "processing"
+    - El cliente hace polling a /api/status/{job_id} para obtener resultado
+    """
+    try:
+        # Verificar que el job existe
+        job_status = await get_job_status(job_id)
+        if job_status["status"] == "not_found":
+            raise HTTPException(status_code=404, detail=f"Job {job_id} no encontrado")
+        
+        # Ruta guardada en el job por /upload-video (sin recorrer el directorio)
+        video_path = await get_job_video_path(job_id)
+        
+        if not video_path:
+            raise HTTPException(status_code=404, detail="Archivo de video no encontrado")
+        
+        # Solo jobs que aún no se enviaron: repetir el POST correría el mismo
+        # job otra vez, pisando el estado y el resultado de uno en curso o terminado
+        if job_status["status"] != "pending":
+            raise _already_submitted(job_id, job_status["status"])
+        
+        logger.info(f"[Job {job_id}] Iniciando procesamiento de: {video_path}")
+        
+        if settings.TASK_QUEUE == "arq":
+            # Procesar en los workers arq (otro proceso/máquina)
+            if not await enqueue_video_job(video_path, job_id, sample_stride):
+                raise _already_submitted(job_id, job_status["status"])
+        else:
+            # Ejecutar procesamiento en background
+            processor = create_video_processor_service()
+            background_tasks.add_task(
+                processor.process_video_async,
+                video_path,
+                job_id,
+                sample_stride
+            )
+        
+        return {
+            "success": True,
+            "job_id": job_id,
+            "status": "processing",
+            "message": "Procesamiento iniciado. Usa GET /api/status/{job_id} para consultar el estado.",
+            "poll_url": f"/api/status/{job_id}"
+        }
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error en process_video: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
@@ -2,23 +2,408 @@
 Servicio de procesamiento de video
 Orquesta la ejecución de los tres modelos de IA en secuencia
 """
+import asyncio
 import time
-import uuid
-import os
 import logging
-from typing import Dict
-from pathlib import Path
+import aiofiles
+import orjson
+from typing import Dict, List, Optional, Tuple
 from config import settings
-from ai_services import (
-    get_path_detection_service,
-    get_gloss_generator_service,
-    get_text_translation_service
-)
+from job_store import job_store, result_file_path
 
 logger = logging.getLogger(__name__)
 
-# Almacenar estado de jobs en memoria (en producción, usar Redis/DB)
-processing_jobs: Dict[str, Dict] = {}
+# Tope de jobs dentro del pipeline: los que exceden esperan sin ocupar colas
+_JOB_SEM = asyncio.Semaphore(settings.MAX_CONCURRENT_JOBS or 2)
+
+
+class AsyncBatchQueue:
+    """
+    Agrupa requests concurrentes en lotes (dynamic batching)
+    
+    Espera hasta max_batch_size items o max_wait_time segundos desde el primero
+    y ejecuta una sola llamada batch_fn(items), repartiendo cada resultado a su
+    request. Amortiza el overhead por llamada del modelo entre varios jobs.
+    """
+    
+    def __init__(self, batch_fn, max_batch_size: int = 8, max_wait_time: float = 0.05):
+        self._batch_fn = batch_fn
+        self._max_batch_size = max_batch_size
+        self._max_wait_time = max_wait_time
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._collector: Optional[asyncio.Task] = None
+    
+    async def add_request(self, item):
+        """Encola un item y espera su resultado dentro del lote"""
+        # Recrear el colector si terminó (cancelado o error no capturado): los
+        # items que quedaron en la cola los toma el nuevo
+        if self._collector is None or self._collector.done():
+            self._collector = asyncio.create_task(self._collect_batches())
+        
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((item, future))
+        return await future
+    
+    async def _collect_batches(self):
+        while True:
+            batch = []
+            try:
+                await self._collect_batch(batch)
+                results = await self._batch_fn([item for item, _ in batch])
+                if len(results) != len(batch):
+                    raise RuntimeError(
+                        f"El lote retornó {len(results)} resultados para {len(batch)} items"
+                    )
+                
+                for (_, future), result in zip(batch, results):
+                    if not future.done():
+                        future.set_result(result)
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+            finally:
+                # Cancelación u otra BaseException: ningún request queda esperando
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(RuntimeError("Lote interrumpido antes de terminar"))
+    
+    async def _collect_batch(self, batch: List):
+        """
+        Espera el primer item y junta en batch los que lleguen dentro de la ventana
+        
+        Llena la lista del llamador para que, si se cancela a mitad, los items
+        ya retirados de la cola no se pierdan.
+        """
+        batch.append(await self._queue.get())
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self._max_wait_time
+        
+        while len(batch) < self._max_batch_size:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+            except asyncio.TimeoutError:
+                break
+
+
+class PipelineOrchestrator:
+    """
+    Ejecuta las tres etapas como workers concurrentes conectados por colas acotadas:
+    video → Path Detection → Gloss Generator → Text Translation
+    
+    Mientras un job genera glosa o traduce, el siguiente ya puede estar en
+    detección de pose. Las colas acotadas (back-pressure) evitan que una etapa
+    rápida acumule trabajo frente a una lenta.
+    
+    Los workers corren en el event loop: los servicios de ai_services ejecutan
+    OpenCV/inferencia en su propio pool de hilos (métodos *_sync), de modo que
+    esperar una etapa nunca bloquea /status ni /upload-video.
+    
+    Entre etapas los datos no pasan por listas ni por models_schemas (que son
+    solo de salida): los keypoints son un único ndarray float32 (frames, 99),
+    del buffer de Path Detection a la entrada del modelo de glosa, y la glosa
+    llega como str al traductor.
+    """
+    
+    def __init__(self, queue_size: int = 2):
+        self._queue_size = queue_size
+        self._pose_queue: Optional[asyncio.Queue] = None
+        self._gloss_queue: Optional[asyncio.Queue] = None
+        self._translation_queue: Optional[asyncio.Queue] = None
+        self._gloss_batcher: Optional[AsyncBatchQueue] = None
+        self._translation_batcher: Optional[AsyncBatchQueue] = None
+        self._path_detection_service = None
+        self._workers: List[asyncio.Task] = []
+    
+    async def start(self, path_detection_service, gloss_generator_service, text_translation_service):
+        """Crea las colas y los workers en el event loop actual (una sola vez)"""
+        if self._workers:
+            return
+        
+        self._path_detection_service = path_detection_service
+        max_wait_time = settings.BATCH_MAX_WAIT_MS / 1000
+        self._gloss_batcher = AsyncBatchQueue(
+            gloss_generator_service.generate_gloss_batch,
+            max_batch_size=settings.BATCH_MAX_SIZE,
+            max_wait_time=max_wait_time
+        )
+        self._translation_batcher = AsyncBatchQueue(
+            text_translation_service.translate_batch,
+            max_batch_size=settings.BATCH_MAX_SIZE,
+            max_wait_time=max_wait_time
+        )
+        
+        self._pose_queue = asyncio.Queue(maxsize=self._queue_size)
+        self._gloss_queue = asyncio.Queue(maxsize=self._queue_size)
+        self._translation_queue = asyncio.Queue(maxsize=self._queue_size)
+        # Un worker de pose por intérprete del pool (INFERENCE_THREADS): varios
+        # videos usan núcleos distintos a la vez
+        self._workers = [
+            asyncio.create_task(self._stage_worker(self._pose_stage, self._pose_queue, self._gloss_queue))
+            for _ in range(max(1, settings.INFERENCE_THREADS))
+        ]
+        # Glosa y traducción tienen varios workers para que el batcher pueda
+        # juntar varios jobs en un mismo lote
+        for _ in range(settings.BATCH_MAX_SIZE):
+            self._workers.append(asyncio.create_task(
+                self._stage_worker(self._gloss_stage, self._gloss_queue, self._translation_queue)
+            ))
+            self._workers.append(asyncio.create_task(
+                self._stage_worker(self._translation_stage, self._translation_queue, None)
+            ))
+    
+    async def submit(self, job_id: str, video_path: str, sample_stride: Optional[int] = None) -> Dict:
+        """
+        Encola un video en el pipeline y espera su resultado
+        
+        Args:
+            video_path: Ruta al archivo de video
+            job_id: ID único del job de procesamiento
+            
+        Returns:
+            Dict con resultado completo o error
+        """
+        if not self._workers:
+            raise RuntimeError("Pipeline no iniciado: llamar a VideoProcessorService.load_services()")
+        
+        job = {
+            "job_id": job_id,
+            "video_path": video_path,
+            "sample_stride": sample_stride,
+            # Reloj monotónico: las duraciones no saltan con ajustes de NTP
+            "overall_start_ns": time.monotonic_ns(),
+            "future": asyncio.get_running_loop().create_future()
+        }
+        
+        # Actualizar estado del job
+        await job_store.update(
+            job_id,
+            status="processing",
+            current_step="Detecting pose (Path Detection)...",
+            progress=10
+        )
+        
+        logger.info(f"[Job {job_id}] Iniciando procesamiento de video: {video_path}")
+        
+        await self._pose_queue.put(job)
+        return await job["future"]
+    
+    async def _stage_worker(self, stage, input_queue: asyncio.Queue, output_queue: Optional[asyncio.Queue]):
+        """Consume jobs de una etapa y los pasa a la siguiente; un error termina solo ese job"""
+        while True:
+            job = await input_queue.get()
+            try:
+                await stage(job)
+            except Exception as e:
+                await self._fail(job, e)
+                continue
+            finally:
+                input_queue.task_done()
+            
+            if output_queue is not None:
+                await output_queue.put(job)
+    
+    async def _pose_stage(self, job: Dict):
+        # ============================================================
+        # PASO 1: PATH DETECTION - Detectar pose del cuerpo
+        # ============================================================
+        job_id = job["job_id"]
+        logger.info(f"[Job {job_id}] PASO 1: Ejecutando PATH DETECTION")
+        await job_store.update(
+            job_id,
+            current_step="Detecting pose (Path Detection)...",
+            progress=15
+        )
+        
+        path_detection_result = await self._detect_pose_segments(
+            job_id, job["video_path"], job["sample_stride"]
+        )
+        
+        if not path_detection_result.get("success"):
+            raise Exception(f"Path Detection falló: {path_detection_result.get('error')}")
+        
+        # El ndarray va al modelo de glosa y, sin pasar a listas, al JSON del
+        # resultado (orjson lo serializa directo)
+        keypoints = path_detection_result.get("keypoints", [])
+        logger.info(f"[Job {job_id}] Path Detection completado - {len(keypoints)} frames procesados")
+        
+        # Los keypoints completos solo viajan en el job y al archivo de
+        # resultado: el registro del job guarda un resumen
+        await job_store.update(
+            job_id,
+            progress=40,
+            path_detection={"frames": len(keypoints), "stored": True}
+        )
+        
+        job["keypoints"] = keypoints
+        job["path_detection"] = path_detection_result
+    
+    async def _detect_pose_segments(
+        self, job_id: str, video_path: str, sample_stride: Optional[int] = None
+    ) -> Dict:
+        """
+        Path Detection con paralelismo de datos: los segmentos del video corren
+        a la vez en el pool del servicio y sus keypoints se concatenan en orden
+        """
+        service = self._path_detection_service
+        segments = await service.plan_segments(video_path, sample_stride)
+        if len(segments) == 1:
+            start_frame, end_frame = segments[0]
+            return await service.detect_pose_from_video(video_path, start_frame, end_frame, sample_stride)
+        
+        logger.info(f"[Job {job_id}] Path Detection en {len(segments)} segmentos")
+        start_ns = time.monotonic_ns()
+        done = 0
+        
+        async def detect_segment(start_frame: int, end_frame: Optional[int]) -> Dict:
+            nonlocal done
+            result = await service.detect_pose_from_video(video_path, start_frame, end_frame, sample_stride)
+            done += 1
+            # Progreso de 15 a 40 a medida que terminan los segmentos
+            await job_store.update(job_id, progress=15 + 25 * done // len(segments))
+            return result
+        
+        results = await asyncio.gather(*[detect_segment(start, end) for start, end in segments])
+        
+        for result in results:
+            if not result.get("success"):
+                return result
+        
+        import numpy as np
+        
+        # Cada segmento retorna un ndarray (frames, 99): se unen sin pasar por listas
+        keypoints = np.concatenate([r["keypoints"] for r in results])
+        return {
+            "success": True,
+            "keypoints": keypoints,
+            "confidence": sum(r["confidence"] for r in results) / len(results),
+            "frames_processed": sum(r["frames_processed"] for r in results),
+            "detection_time_ms": (time.monotonic_ns() - start_ns) / 1e6,
+            "total_frames": results[0].get("total_frames"),
+            "frame_stride": results[0].get("frame_stride"),
+            "model_used": results[0].get("model_used"),
+            "segments": len(segments)
+        }
+    
+    async def _gloss_stage(self, job: Dict):
+        # ============================================================
+        # PASO 2: GLOSS GENERATOR - Generar glosa
+        # ============================================================
+        job_id = job["job_id"]
+        logger.info(f"[Job {job_id}] PASO 2: Ejecutando GLOSS GENERATOR")
+        await job_store.update(
+            job_id,
+            current_step="Generating gloss (Recurrent Model)...",
+            progress=50
+        )
+        
+        gloss_result = await self._gloss_batcher.add_request(job.pop("keypoints"))
+        
+        if not gloss_result.get("success"):
+            raise Exception(f"Gloss Generator falló: {gloss_result.get('error')}")
+        
+        gloss_text = gloss_result.get("gloss", "")
+        logger.info(f"[Job {job_id}] Gloss Generator completado - Glosa: {gloss_text}")
+        
+        await job_store.update(
+            job_id,
+            progress=70,
+            gloss_generation=gloss_result
+        )
+        
+        job["gloss_generation"] = gloss_result
+    
+    async def _translation_stage(self, job: Dict):
+        # ============================================================
+        # PASO 3: TEXT TRANSLATION - Traducir glosa a español
+        # ============================================================
+        job_id = job["job_id"]
+        gloss_result = job["gloss_generation"]
+        gloss_text = gloss_result.get("gloss", "")
+        logger.info(f"[Job {job_id}] PASO 3: Ejecutando TEXT TRANSLATION")
+        await job_store.update(
+            job_id,
+            current_step="Translating to Spanish (Text Generator)...",
+            progress=80
+        )
+        
+        translation_result = await self._translation_batcher.add_request(gloss_text)
+        
+        if not translation_result.get("success"):
+            raise Exception(f"Text Translation falló: {translation_result.get('error')}")
+        
+        translation_text = translation_result.get("translation", "")
+        logger.info(f"[Job {job_id}] Text Translation completado - Traducción: {translation_text}")
+        
+        await job_store.update(
+            job_id,
+            progress=95,
+            text_translation=translation_result
+        )
+        
+        # ============================================================
+        # COMPLETADO - Compilar resultado final
+        # ============================================================
+        total_time_ms = self._elapsed_ms(job)
+        
+        final_result = {
+            "success": True,
+            "job_id": job_id,
+            "status": "completed",
+            "path_detection": job["path_detection"],
+            "gloss_generation": gloss_result,
+            "text_translation": translation_result,
+            "total_processing_time_ms": total_time_ms,
+            "final_gloss": gloss_text,
+            "final_translation": translation_text
+        }
+        
+        logger.info(f"[Job {job_id}] Procesamiento completado exitosamente en {total_time_ms:.2f}ms")
+        
+        self._resolve(job, final_result)
+    
+    async def _fail(self, job: Dict, e: Exception):
+        """Marca el job como fallido y resuelve su future con el error"""
+        job_id = job["job_id"]
+        logger.error(f"[Job {job_id}] Error en procesamiento: {str(e)}")
+        
+        error_result = {
+            "success": False,
+            "job_id": job_id,
+            "status": "error",
+            "error": str(e),
+            "total_processing_time_ms": self._elapsed_ms(job)
+        }
+        
+        try:
+            await job_store.update(
+                job_id,
+                status="error",
+                error=str(e)
+            )
+        except Exception as store_error:
+            # No dejar el future sin resolver ni tumbar el worker
+            logger.warning(f"[Job {job_id}] No se pudo guardar el error: {store_error}")
+        
+        self._resolve(job, error_result)
+    
+    @staticmethod
+    def _elapsed_ms(job: Dict) -> float:
+        """Milisegundos desde que el job entró al pipeline (éxito y error)"""
+        return (time.monotonic_ns() - job["overall_start_ns"]) / 1e6
+    
+    @staticmethod
+    def _resolve(job: Dict, result: Dict):
+        # El future puede haberse cancelado si la tarea que esperaba terminó
+        if not job["future"].done():
+            job["future"].set_result(result)
+
+
+# Pipeline compartido por todos los jobs del proceso
+pipeline_orchestrator = PipelineOrchestrator()
 
 
 class VideoProcessorService:
@@ -33,8 +418,43 @@ class VideoProcessorService:
         self.path_detection_service = None
         self.gloss_generator_service = None
         self.text_translation_service = None
+        # Referencias a las escrituras de resultados en curso (asyncio solo
+        # guarda referencias débiles a las tareas)
+        self._pending_saves = set()
     
-    async def process_video_async(self, video_path: str, job_id: str) -> Dict:
+    async def load_services(self):
+        """
+        Resuelve los servicios IA una sola vez y arranca el pipeline con ellos
+        
+        Se llama desde el startup de FastAPI; process_video_async lo repite
+        por si el servicio se usa fuera de la app (no hace nada si ya cargó).
+        """
+        if self.path_detection_service is None:
+            # Import diferido: ai_services arrastra numpy/numba/onnxruntime y los
+            # procesos que solo reciben uploads no deben pagar esa carga
+            from ai_services import (
+                get_path_detection_service,
+                get_gloss_generator_service,
+                get_text_translation_service
+            )
+            
+            self.path_detection_service = await get_path_detection_service()
+            self.gloss_generator_service = await get_gloss_generator_service()
+            self.text_translation_service = await get_text_translation_service()
+        
+        await pipeline_orchestrator.start(
+            self.path_detection_service,
+            self.gloss_generator_service,
+            self.text_translation_service
+        )
+    
+    async def process_video_async(
+        self,
+        video_path: str,
+        job_id: str,
+        sample_stride: Optional[int] = None,
+        from_statuses: Tuple[str, ...] = ("pending",)
+    ) -> Dict:
         """
         Procesa un video de forma asíncrona a través del pipeline completo
         
@@ -43,121 +463,57 @@ class VideoProcessorService:
         2. Generar glosa basada en los keypoints (Gloss Generator)
         3. Traducir glosa a texto natural en español (Text Translation)
         
+        Cada paso corre en su propio worker (ver PipelineOrchestrator), así que
+        varios jobs avanzan a la vez en etapas distintas.
+        
         Args:
             video_path: Ruta al archivo de video
             job_id: ID único del job de procesamiento
+            sample_stride: Procesar 1 de cada N frames en Path Detection
+                (None = según POSE_SAMPLE_FPS)
+            from_statuses: Estados desde los que el job puede entrar al pipeline;
+                en cualquier otro (en curso, terminado) no se toca
             
         Returns:
             Dict con resultado completo o error
         """
+        await self.load_services()
         
-        try:
-            overall_start = time.time()
-            
-            # Actualizar estado del job
-            processing_jobs[job_id]["status"] = "processing"
-            processing_jobs[job_id]["current_step"] = "Detecting pose (Path Detection)..."
-            processing_jobs[job_id]["progress"] = 10
-            
-            logger.info(f"[Job {job_id}] Iniciando procesamiento de video: {video_path}")
-            
-            # ============================================================
-            # PASO 1: PATH DETECTION - Detectar pose del cuerpo
-            # ============================================================
-            logger.info(f"[Job {job_id}] PASO 1: Ejecutando PATH DETECTION")
-            processing_jobs[job_id]["current_step"] = "Detecting pose (Path Detection)..."
-            processing_jobs[job_id]["progress"] = 15
-            
-            path_detection_service = await get_path_detection_service()
-            path_detection_result = await path_detection_service.detect_pose_from_video(video_path)
-            
-            if not path_detection_result.get("success"):
-                raise Exception(f"Path Detection falló: {path_detection_result.get('error')}")
-            
-            keypoints = path_detection_result.get("keypoints", [])
-            logger.info(f"[Job {job_id}] Path Detection completado - {len(keypoints)} frames procesados")
-            
-            processing_jobs[job_id]["progress"] = 40
-            processing_jobs[job_id]["path_detection"] = path_detection_result
-            
-            # ============================================================
-            # PASO 2: GLOSS GENERATOR - Generar glosa
-            # ============================================================
-            logger.info(f"[Job {job_id}] PASO 2: Ejecutando GLOSS GENERATOR")
-            processing_jobs[job_id]["current_step"] = "Generating gloss (Recurrent Model)..."
-            processing_jobs[job_id]["progress"] = 50
-            
-            gloss_generator_service = await get_gloss_generator_service()
-            gloss_result = await gloss_generator_service.generate_gloss(keypoints)
-            
-            if not gloss_result.get("success"):
-                raise Exception(f"Gloss Generator falló: {gloss_result.get('error')}")
-            
-            gloss_text = gloss_result.get("gloss", "")
-            logger.info(f"[Job {job_id}] Gloss Generator completado - Glosa: {gloss_text}")
-            
-            processing_jobs[job_id]["progress"] = 70
-            processing_jobs[job_id]["gloss_generation"] = gloss_result
-            
-            # ============================================================
-            # PASO 3: TEXT TRANSLATION - Traducir glosa a español
-            # ============================================================
-            logger.info(f"[Job {job_id}] PASO 3: Ejecutando TEXT TRANSLATION")
-            processing_jobs[job_id]["current_step"] = "Translating to Spanish (Text Generator)..."
-            processing_jobs[job_id]["progress"] = 80
-            
-            text_translation_service = await get_text_translation_service()
-            translation_result = await text_translation_service.translate_gloss_to_text(gloss_text)
-            
-            if not translation_result.get("success"):
-                raise Exception(f"Text Translation falló: {translation_result.get('error')}")
-            
-            translation_text = translation_result.get("translation", "")
-            logger.info(f"[Job {job_id}] Text Translation completado - Traducción: {translation_text}")
-            
-            processing_jobs[job_id]["progress"] = 95
-            processing_jobs[job_id]["text_translation"] = translation_result
-            
-            # ============================================================
-            # COMPLETADO - Compilar resultado final
-            # ============================================================
-            total_time_ms = (time.time() - overall_start) * 1000
-            
-            final_result = {
-                "success": True,
-                "job_id": job_id,
-                "status": "completed",
-                "path_detection": path_detection_result,
-                "gloss_generation": gloss_result,
-                "text_translation": translation_result,
-                "total_processing_time_ms": total_time_ms,
-                "final_gloss": gloss_text,
-                "final_translation": translation_text
-            }
-            
-            processing_jobs[job_id]["status"] = "completed"
-            processing_jobs[job_id]["progress"] = 100
-            processing_jobs[job_id]["result"] = final_result
-            
-            logger.info(f"[Job {job_id}] Procesamiento completado exitosamente en {total_time_ms:.2f}ms")
-            
-            return final_result
+        # Marcar la espera para que /status y /stream la reflejen. Atómico:
+        # un POST repetido o una llamada duplicada no reinicia un job en curso
+        # ni pisa un estado final
+        if not await job_store.update_if_status(
+            job_id, from_statuses, status="queued", current_step="Waiting for a free slot..."
+        ):
+            logger.warning(f"[Job {job_id}] Ya fue enviado a procesar: se ignora la llamada")
+            return {"success": False, "error": f"Job {job_id} ya fue enviado a procesar"}
+        async with _JOB_SEM:
+            result = await pipeline_orchestrator.submit(job_id, video_path, sample_stride)
+        if not result.get("success"):
+            return result
         
+        # Escritura en segundo plano: no retiene la tarea del job mientras
+        # se serializa y se escribe el JSON
+        task = asyncio.create_task(self._store_result(job_id, build_result_response(result)))
+        self._pending_saves.add(task)
+        task.add_done_callback(self._pending_saves.discard)
+        return result
+    
+    async def wait_pending_saves(self):
+        """Espera las escrituras de resultados en segundo plano (apagado ordenado)"""
+        if self._pending_saves:
+            await asyncio.gather(*self._pending_saves, return_exceptions=True)
+    
+    async def _store_result(self, job_id: str, response: Dict):
+        """Guarda el resultado y recién entonces marca el job como completado"""
+        # /api/result sirve el archivo tal cual: "completed" implica que ya existe
+        try:
+            if await self.save_result(job_id, response):
+                await job_store.update(job_id, status="completed", progress=100)
+            else:
+                await job_store.update(job_id, status="error", error="No se pudo guardar el resultado")
         except Exception as e:
-            logger.error(f"[Job {job_id}] Error en procesamiento: {str(e)}")
-            
-            error_result = {
-                "success": False,
-                "job_id": job_id,
-                "status": "error",
-                "error": str(e),
-                "total_processing_time_ms": (time.time() - overall_start) * 1000
-            }
-            
-            processing_jobs[job_id]["status"] = "error"
-            processing_jobs[job_id]["error"] = str(e)
-            
-            return error_result
+            logger.error(f"[Job {job_id}] Error actualizando estado final: {str(e)}")
     
     async def save_result(self, job_id: str, result: Dict) -> str:
         """
@@ -171,14 +527,18 @@ class VideoProcessorService:
             Ruta del archivo guardado
         """
         try:
-            results_dir = Path(settings.RESULTS_DIR)
-            results_dir.mkdir(parents=True, exist_ok=True)
-            
-            result_file = results_dir / f"{job_id}_result.json"
+            result_file = result_file_path(job_id)
+            result_file.parent.mkdir(parents=True, exist_ok=True)
             
-            import json
-            with open(result_file, 'w', encoding='utf-8') as f:
-                json.dump(result, f, indent=2, ensure_ascii=False, default=str)
+            # orjson serializa ndarrays directamente y produce UTF-8 compacto
+            # (sin indent: el pretty-print duplica tamaño y tiempo)
+            data = orjson.dumps(
+                result,
+                option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS,
+                default=str
+            )
+            async with aiofiles.open(result_file, 'wb') as f:
+                await f.write(data)
             
             logger.info(f"Resultado guardado en: {result_file}")
             return str(result_file)
@@ -188,48 +548,83 @@ class VideoProcessorService:
             return ""
 
 
+def build_result_response(result: Dict) -> Dict:
+    """Respuesta de /api/result a partir del resultado del pipeline"""
+    return {
+        "success": True,
+        "job_id": result["job_id"],
+        "gloss": result.get("final_gloss", ""),
+        "translation": result.get("final_translation", ""),
+        "confidence_gloss": result.get("gloss_generation", {}).get("confidence", 0),
+        "confidence_translation": result.get("text_translation", {}).get("confidence", 0),
+        "processing_time_ms": result.get("total_processing_time_ms", 0),
+        "detailed_results": {
+            "path_detection": result.get("path_detection"),
+            "gloss_generation": result.get("gloss_generation"),
+            "text_translation": result.get("text_translation")
+        }
+    }
+
+
+# Instancia compartida: los servicios IA se resuelven una vez por proceso
+_video_processor_service: Optional[VideoProcessorService] = None
+
+
 def create_video_processor_service() -> VideoProcessorService:
-    """Factory para crear instancia del servicio"""
-    return VideoProcessorService()
+    """Factory para obtener la instancia compartida del servicio"""
+    global _video_processor_service
+    if _video_processor_service is None:
+        _video_processor_service = VideoProcessorService()
+    return _video_processor_service
 
 
-def get_job_status(job_id: str) -> Dict:
-    """Obtiene el estado actual de un job"""
-    if job_id not in processing_jobs:
-        return {
-            "job_id": job_id,
-            "status": "not_found",
-            "progress": 0,
-            "current_step": "Unknown"
-        }
-    
-    job = processing_jobs[job_id]
-    return {
-        "job_id": job_id,
-        "status": job.get("status", "unknown"),
-        "progress": job.get("progress", 0),
-        "current_step": job.get("current_step", ""),
-        "result": job.get("result", None) if job.get("status") == "completed" else None,
-        "error": job.get("error", None) if job.get("status") == "error" else None
-    }
+# Pool de conexión a la cola arq (TASK_QUEUE=arq), creado en el primer uso
+_arq_pool = None
 
 
-def create_new_job(video_filename: str) -> str:
+async def enqueue_video_job(video_path: str, job_id: str, sample_stride: Optional[int] = None) -> bool:
     """
-    Crea un nuevo job de procesamiento
+    Encola el job para los workers arq (ver worker.py)
+    
+    El job sobrevive a reinicios de la API y arq lo reintenta si el worker
+    que lo procesaba se cae.
     
-    Args:
-        video_filename: Nombre del archivo de video
-        
     Returns:
-        ID único del job
+        False si el job ya no está "pending" (otro POST lo envió) o arq ya lo
+        tiene (encolado, en curso o con resultado retenido)
     """
-    job_id = str(uuid.uuid4())
-    processing_jobs[job_id] = {
-        "status": "pending",
-        "video_filename": video_filename,
-        "progress": 0,
-        "current_step": "Waiting to start...",
-        "created_at": time.time()
-    }
-    return job_id
+    global _arq_pool
+    if _arq_pool is None:
+        from arq import create_pool
+        from arq.connections import RedisSettings
+        
+        _arq_pool = await create_pool(RedisSettings.from_dsn(settings.REDIS_URL))
+    
+    # Marcar antes de encolar: un worker rápido podría pasar el job a
+    # "processing" y un update posterior lo devolvería a "queued"
+    if not await job_store.update_if_status(
+        job_id, ("pending",), status="queued", current_step="Waiting for a worker..."
+    ):
+        return False
+    
+    try:
+        # _job_id evita encolar dos veces el mismo job si el cliente repite el POST
+        job = await _arq_pool.enqueue_job(
+            "process_video_job", video_path, job_id, sample_stride, _job_id=job_id
+        )
+    except Exception:
+        await job_store.update(job_id, status="pending", current_step="Waiting to start...")
+        raise
+    
+    if job is None:
+        logger.warning(f"[Job {job_id}] arq ya tiene este job: no se encola de nuevo")
+        return False
+    return True
+
+
+async def close_task_queue():
+    """Cierra la conexión a la cola arq si se abrió"""
+    global _arq_pool
+    if _arq_pool is not None:
+        await _arq_pool.close()
+        _arq_pool = None
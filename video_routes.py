@@ -1,24 +1,152 @@
 """
-Rutas (Endpoints) de la API para video
+Rutas (Endpoints) de la API para video: upload, estado y resultado
+
+No importan el pipeline ni los modelos IA (ver processing_routes.py), así
+que un tier que solo recibe uploads arranca sin cargar dependencias de ML.
 """
+import io
 import os
 import logging
-from fastapi import APIRouter, UploadFile, File, HTTPException, BackgroundTasks
-from fastapi.responses import JSONResponse
+import tempfile
+from fastapi import APIRouter, UploadFile, File, HTTPException
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
 from pathlib import Path
-import shutil
+from typing import Optional
+import aiofiles
+import json
 from config import settings
-from models_schemas import ProcessingResponse, StatusQueryResponse
-from video_processor import (
-    create_video_processor_service,
+from job_store import (
+    job_store,
     get_job_status,
-    create_new_job
+    create_new_job,
+    result_file_path
 )
 import asyncio
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api", tags=["video"])
 
+# Tamaño de bloque para guardar uploads
+_UPLOAD_CHUNK_SIZE = 1 << 20  # 1 MiB
+# Estados en los que el job ya no emitirá más eventos
+_TERMINAL_STATUSES = ("completed", "error")
+# Comentario SSE periódico para que proxies no cierren la conexión inactiva
+_SSE_KEEPALIVE_SECONDS = 15
+
+
+# Margen para los headers y boundaries del multipart sobre el tamaño del archivo
+_MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+
+def _upload_too_large() -> HTTPException:
+    return HTTPException(
+        status_code=413,
+        detail=f"Archivo demasiado grande. Máximo: {settings.MAX_VIDEO_SIZE_MB}MB"
+    )
+
+
+class UploadSizeLimitMiddleware:
+    """
+    Corta con 413 los uploads que superan MAX_VIDEO_SIZE_MB mientras llegan
+    
+    Middleware ASGI puro: FastAPI lee y guarda todo el multipart antes de
+    llamar al endpoint, así que el límite tiene que aplicarse al body mismo.
+    Un Content-Length excesivo se rechaza sin leer nada; sin él (chunked) se
+    cuentan los bytes de cada mensaje http.request y el parseo se aborta en
+    cuanto se pasa el límite, sin terminar de escribir el temporal.
+    """
+    
+    def __init__(self, app, path: str = "/api/upload-video"):
+        self.app = app
+        self.path = path
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] != self.path:
+            await self.app(scope, receive, send)
+            return
+        
+        max_body_bytes = settings.MAX_VIDEO_SIZE_MB * 1024 * 1024 + _MULTIPART_OVERHEAD_BYTES
+        for name, value in scope["headers"]:
+            if name == b"content-length":
+                try:
+                    too_large = int(value) > max_body_bytes
+                except ValueError:
+                    too_large = False
+                if too_large:
+                    exc = _upload_too_large()
+                    response = JSONResponse(status_code=exc.status_code, content={"detail": exc.detail})
+                    await response(scope, receive, send)
+                    return
+                break
+        
+        received = 0
+        
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > max_body_bytes:
+                    # FastAPI propaga las HTTPException del parseo del body,
+                    # así que el cliente recibe el 413 y no un 400 genérico
+                    raise _upload_too_large()
+            return message
+        
+        await self.app(scope, limited_receive, send)
+
+
+async def _write_upload_chunks(file: UploadFile, file_path: Path, max_size_bytes: int) -> int:
+    """
+    Escribe el upload por bloques sin bloquear el event loop
+    
+    El middleware ya cortó el body si excedía el límite (con la holgura del
+    multipart); aquí se valida el tamaño exacto del archivo.
+    """
+    file_size = 0
+    async with aiofiles.open(file_path, "wb") as buffer:
+        while chunk := await file.read(_UPLOAD_CHUNK_SIZE):
+            file_size += len(chunk)
+            if file_size > max_size_bytes:
+                raise _upload_too_large()
+            await buffer.write(chunk)
+    return file_size
+
+
+def _disk_fileno(spooled) -> Optional[int]:
+    """
+    fd del temporal del upload si ya está en disco, o None (copia por bloques)
+    
+    fileno() sobre un SpooledTemporaryFile en memoria lo volcaría a disco, y
+    no hay API pública para saber si ya rodó: si falta _rolled (otra versión
+    de Python) se asume en memoria.
+    """
+    if not hasattr(os, "sendfile"):
+        return None
+    if isinstance(spooled, tempfile.SpooledTemporaryFile) and not getattr(spooled, "_rolled", False):
+        return None
+    try:
+        return spooled.fileno()
+    except (AttributeError, OSError, io.UnsupportedOperation):
+        return None
+
+
+def _sendfile_copy(src_fd: int, file_path: Path, start: int, size: int) -> int:
+    """
+    Copia size bytes del temporal del upload, desde start, a file_path con
+    os.sendfile (corre en executor)
+    
+    Returns:
+        Bytes copiados
+    """
+    with open(file_path, "wb") as dst:
+        copied = 0
+        while copied < size:
+            sent = os.sendfile(dst.fileno(), src_fd, start + copied, size - copied)
+            if sent == 0:
+                break
+            copied += sent
+    return copied
+
 
 @router.post("/upload-video", response_model=dict)
 async def upload_video(file: UploadFile = File(...)):
@@ -39,7 +167,7 @@ async def upload_video(file: UploadFile = File(...)):
             raise HTTPException(status_code=400, detail="Solo se aceptan archivos de video")
         
         # Crear job nuevo
-        job_id = create_new_job(file.filename)
+        job_id = await create_new_job(file.filename)
         logger.info(f"[Job {job_id}] Video uploaded: {file.filename}")
         
         # Guardar archivo
@@ -48,20 +176,29 @@ async def upload_video(file: UploadFile = File(...)):
         
         file_path = upload_dir / f"{job_id}_{file.filename}"
         
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        max_size_bytes = settings.MAX_VIDEO_SIZE_MB * 1024 * 1024
+        try:
+            src_fd = _disk_fileno(file.file) if file.size is not None else None
+            if src_fd is not None:
+                # El multipart ya se volcó a un temporal en disco: el kernel
+                # copia page cache a page cache sin pasar por Python
+                if file.size > max_size_bytes:
+                    raise _upload_too_large()
+                loop = asyncio.get_running_loop()
+                file_size = await loop.run_in_executor(
+                    None, _sendfile_copy, src_fd, file_path, file.file.tell(), file.size
+                )
+                if file_size != file.size:
+                    raise OSError(f"Copia incompleta del upload: {file_size} de {file.size} bytes")
+            else:
+                file_size = await _write_upload_chunks(file, file_path, max_size_bytes)
+        except Exception:
+            if file_path.exists():
+                os.remove(file_path)
+            raise
         
-        file_size = os.path.getsize(file_path)
         logger.info(f"[Job {job_id}] Archivo guardado - Tamaño: {file_size} bytes")
-        
-        # Validar tamaño
-        max_size_bytes = settings.MAX_VIDEO_SIZE_MB * 1024 * 1024
-        if file_size > max_size_bytes:
-            os.remove(file_path)
-            raise HTTPException(
-                status_code=413,
-                detail=f"Archivo demasiado grande. Máximo: {settings.MAX_VIDEO_SIZE_MB}MB"
-            )
+        await job_store.update(job_id, video_path=str(file_path))
         
         return {
             "success": True,
@@ -78,98 +215,97 @@ async def upload_video(file: UploadFile = File(...)):
         raise HTTPException(status_code=500, detail=f"Error al cargar video: {str(e)}")
 
 
-@router.post("/process-video/{job_id}")
-async def process_video(
-    job_id: str,
-    background_tasks: BackgroundTasks
-):
-    """
-    Endpoint para procesar un video
-    
-    Pipeline de procesamiento:
-    1. Path Detection - Detecta la pose del cuerpo
-    2. Gloss Generator - Genera glosa (representación de señas)
-    3. Text Translation - Traduce glosa a español
-    
-    Request: POST /api/process-video/{job_id}
-    Response: Estado del procesamiento + job_id
-    
-    Flujo esperado:
-    - El cliente recibe una respuesta inmediata con status "processing"
-    - El cliente hace polling a /api/status/{job_id} para obtener resultado
-    """
-    try:
-        # Verificar que el job existe
-        job_status = get_job_status(job_id)
-        if job_status["status"] == "not_found":
-            raise HTTPException(status_code=404, detail=f"Job {job_id} no encontrado")
-        
-        # Encontrar el archivo de video
-        upload_dir = Path(settings.UPLOAD_DIR)
-        video_files = list(upload_dir.glob(f"{job_id}_*"))
-        
-        if not video_files:
-            raise HTTPException(status_code=404, detail="Archivo de video no encontrado")
-        
-        video_path = str(video_files[0])
-        logger.info(f"[Job {job_id}] Iniciando procesamiento de: {video_path}")
-        
-        # Ejecutar procesamiento en background
-        processor = create_video_processor_service()
-        background_tasks.add_task(
-            processor.process_video_async,
-            video_path,
-            job_id
-        )
-        
-        return {
-            "success": True,
-            "job_id": job_id,
-            "status": "processing",
-            "message": "Procesamiento iniciado. Usa GET /api/status/{job_id} para consultar el estado.",
-            "poll_url": f"/api/status/{job_id}"
-        }
-    
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error en process_video: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
-
-
 @router.get("/status/{job_id}", response_model=dict)
 async def get_status(job_id: str):
     """
     Endpoint para consultar el estado del procesamiento
     
     Request: GET /api/status/{job_id}
-    Response: Estado actual, progreso y resultado si está completado
+    Response: Estado actual y progreso (el resultado se pide a /api/result)
     
     Estados posibles:
     - pending: Esperando para iniciar
+    - queued: Esperando un lugar libre en el pipeline (MAX_CONCURRENT_JOBS)
     - processing: En procesamiento
     - completed: Completado exitosamente
     - error: Error durante procesamiento
     - not_found: Job no existe
     """
     try:
-        status = get_job_status(job_id)
+        status = await get_job_status(job_id)
         
-        return {
+        # Respuesta ya serializable: JSONResponse evita la validación de FastAPI
+        return JSONResponse(content={
             "success": True,
             "job_id": job_id,
             "status": status["status"],
             "progress": status["progress"],
             "current_step": status["current_step"],
-            "result": status.get("result"),
             "error": status.get("error")
-        }
+        })
     
     except Exception as e:
         logger.error(f"Error en get_status: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
 
 
+@router.get("/stream/{job_id}")
+async def stream_status(job_id: str):
+    """
+    Endpoint SSE con el progreso del procesamiento (alternativa a hacer polling)
+    
+    Request: GET /api/stream/{job_id}  (Accept: text/event-stream)
+    Response: un evento por cambio de progreso, solo con los campos que cambiaron
+    
+    Ejemplo de eventos:
+        data: {"status": "processing", "progress": 10, "step": "Detecting pose (Path Detection)..."}
+        data: {"progress": 40}
+        data: {"status": "completed", "progress": 100}
+    
+    El stream se cierra al llegar a "completed" o "error"; el resultado se
+    obtiene después con GET /api/result/{job_id}.
+    """
+    # Suscribir antes de leer el estado para no perder updates intermedios
+    events = await job_store.subscribe(job_id)
+    try:
+        status = await get_job_status(job_id)
+    except Exception:
+        await job_store.unsubscribe(job_id, events)
+        raise
+    
+    if status["status"] == "not_found":
+        await job_store.unsubscribe(job_id, events)
+        raise HTTPException(status_code=404, detail=f"Job {job_id} no encontrado")
+    
+    async def event_stream():
+        try:
+            # Estado inicial para clientes que se conectan con el job ya iniciado
+            event = {
+                "status": status["status"],
+                "progress": status["progress"],
+                "step": status["current_step"]
+            }
+            while True:
+                yield f"data: {json.dumps(event, ensure_ascii=False)}\n\n"
+                if event.get("status") in _TERMINAL_STATUSES:
+                    break
+                
+                while True:
+                    try:
+                        event = await asyncio.wait_for(events.get(), _SSE_KEEPALIVE_SECONDS)
+                        break
+                    except asyncio.TimeoutError:
+                        yield ": keepalive\n\n"
+        finally:
+            await job_store.unsubscribe(job_id, events)
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @router.get("/result/{job_id}")
 async def get_result(job_id: str):
     """
@@ -189,7 +325,7 @@ async def get_result(job_id: str):
     }
     """
     try:
-        status = get_job_status(job_id)
+        status = await get_job_status(job_id)
         
         if status["status"] == "not_found":
             raise HTTPException(status_code=404, detail=f"Job {job_id} no encontrado")
@@ -200,22 +336,13 @@ async def get_result(job_id: str):
                 detail=f"Job aún no completado. Estado actual: {status['status']}"
             )
         
-        result = status.get("result", {})
+        result_file = result_file_path(job_id)
+        if not result_file.exists():
+            raise HTTPException(status_code=404, detail=f"Resultado del job {job_id} no encontrado")
         
-        return {
-            "success": True,
-            "job_id": job_id,
-            "gloss": result.get("final_gloss", ""),
-            "translation": result.get("final_translation", ""),
-            "confidence_gloss": result.get("gloss_generation", {}).get("confidence", 0),
-            "confidence_translation": result.get("text_translation", {}).get("confidence", 0),
-            "processing_time_ms": result.get("total_processing_time_ms", 0),
-            "detailed_results": {
-                "path_detection": result.get("path_detection"),
-                "gloss_generation": result.get("gloss_generation"),
-                "text_translation": result.get("text_translation")
-            }
-        }
+        # JSON ya serializado al terminar el job: se envía desde disco
+        # (sendfile) sin volver a construir ni serializar el dict
+        return FileResponse(result_file, media_type="application/json")
     
     except HTTPException:
         raise
@@ -0,0 +1,56 @@
+"""
+Worker arq para procesar videos fuera del proceso de la API (TASK_QUEUE=arq)
+
+Ejecutar con:
+    arq worker.WorkerSettings
+
+Requiere REDIS_URL (cola y estado de jobs compartidos con la API) y que
+UPLOAD_DIR / RESULTS_DIR apunten al mismo almacenamiento que la API.
+"""
+import logging
+from typing import Optional
+from arq.connections import RedisSettings
+from config import settings
+from video_processor import create_video_processor_service
+
+logging.basicConfig(
+    level=settings.LOG_LEVEL,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+async def startup(ctx):
+    """Carga los modelos IA una vez por worker"""
+    processor = create_video_processor_service()
+    await processor.load_services()
+    ctx["processor"] = processor
+    logger.info("Worker listo: servicios IA cargados")
+
+
+async def shutdown(ctx):
+    """Termina de escribir los resultados pendientes antes de salir"""
+    await ctx["processor"].wait_pending_saves()
+
+
+async def process_video_job(ctx, video_path: str, job_id: str, sample_stride: Optional[int] = None):
+    """Tarea arq: mismo pipeline que /process-video con BackgroundTasks"""
+    processor = ctx["processor"]
+    # "queued" lo deja la API al encolar; "processing" es un reintento de arq
+    # tras caerse el worker anterior (arq no corre dos veces el mismo job_id)
+    result = await processor.process_video_async(
+        video_path, job_id, sample_stride, from_statuses=("queued", "processing")
+    )
+    # arq da el job por terminado al retornar: el resultado debe estar en disco
+    await processor.wait_pending_saves()
+    return {"job_id": job_id, "success": result.get("success", False)}
+
+
+class WorkerSettings:
+    """Configuración leída por `arq worker.WorkerSettings`"""
+    functions = [process_video_job]
+    on_startup = startup
+    on_shutdown = shutdown
+    redis_settings = RedisSettings.from_dsn(settings.REDIS_URL or "redis://localhost:6379")
+    max_jobs = settings.MAX_CONCURRENT_JOBS
+    job_timeout = settings.JOB_TIMEOUT_SECONDS